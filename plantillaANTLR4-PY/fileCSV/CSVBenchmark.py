@@ -0,0 +1,188 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from antlr4 import InputStream, CommonTokenStream
+from CSVLexer import CSVLexer
+from CSVParser import CSVParser
+from FileCSVVisitorImpl import FileCSVVisitorImpl
+from Driver import analisis_calif, escribir_csv
+
+# resource solo existe en unix; sin el no se reporta el RSS
+try:
+    import resource
+except ImportError:
+    resource = None
+
+HEADER = ",,PA,Q1,Q2,PA,PA,LAB,EXA,PA,CAL,RED"
+# el pipeline guarda el arbol completo (~11 KB de RSS por fila a ~1.4k filas/s):
+# los tamaños default caben en memoria; los grandes piden GB y horas por variante
+FILAS = (1000, 10_000, 50_000)
+FILAS_GRANDES = (100_000, 1_000_000, 10_000_000)
+VARIANTES = ('simple', 'comillas', 'escapadas', 'crlf', 'vacias')
+FASES = ('lexer', 'parser', 'visitor', 'analisis_calif', 'escritura')
+
+_NOMBRES = ('DAVID', 'SAUL', 'RAFAEL', 'MARIO', 'LOBSANG', 'FELIPE', 'ELISEO', 'JESÚS')
+_APELLIDOS = ('ANAYA', 'CERVANTES', 'APARICIO', 'VIVAR', 'ARIAS', 'FLORES', 'HERNÁNDEZ', 'ARMENTA')
+_CALIFS = ('0', '2', '3', '4', '4.6', '5.3', '6', '6.75', '7.0', '7.24', '7.25', '10')
+
+
+def _nombre(rng, variante):
+    apellidos = f"{rng.choice(_APELLIDOS)} {rng.choice(_APELLIDOS)}"
+    nombre = rng.choice(_NOMBRES)
+    if variante == 'comillas':
+        return f'"{apellidos}, {nombre}"'
+    if variante == 'escapadas':
+        return f'"{apellidos} ""{nombre}"""'
+    return f"{apellidos} {nombre}"
+
+
+def generar_lista(path, filas, variante='simple', semilla=0):
+    """
+    Escribe un CSV con la forma de lista.csv: encabezado y filas de calificaciones
+
+    Variantes: simple, comillas (nombre entre comillas con coma), escapadas
+    (comillas "" dentro del nombre), crlf (saltos \\r\\n) y vacias (~20% de
+    calificaciones vacias). La misma semilla genera el mismo archivo.
+    """
+    rng = random.Random(semilla)
+    salto = '\r\n' if variante == 'crlf' else '\n'
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        file.write(HEADER + salto)
+        for i in range(1, filas + 1):
+            califs = [rng.choice(_CALIFS) for _ in range(8)]
+            if variante == 'vacias':
+                califs = [c if rng.random() >= 0.2 else '' for c in califs]
+            file.write(f"{i},{_nombre(rng, variante)},{','.join(califs)},,{salto}")
+
+
+def _rss_pico_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS lo da en bytes, linux en KB
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def correr_caso(path, filas):
+    """
+    Corre el pipeline completo sobre un archivo y mide cada fase por separado
+
+    Se llama en un proceso nuevo por caso para que el RSS pico sea solo de este
+    archivo; el RSS de cada fase es el pico acumulado al terminarla.
+    """
+    fases = {}
+    tiempos = {}
+
+    @contextlib.contextmanager
+    def fase(nombre):
+        inicio = time.perf_counter()
+        yield
+        segundos = time.perf_counter() - inicio
+        tiempos[nombre] = segundos
+        fases[nombre] = {
+            'segundos': segundos,
+            'filas_por_seg': filas / segundos if segundos else None,
+            'rss_pico_kb': _rss_pico_kb()
+        }
+
+    with open(path, 'r', encoding='utf-8') as file:
+        content = file.read()
+
+    with fase('lexer'):
+        tokens = CommonTokenStream(CSVLexer(InputStream(content)))
+        tokens.fill()
+
+    with fase('parser'):
+        parser = CSVParser(tokens)
+        parser.removeErrorListeners()
+        tree = parser.csvFile()
+
+    with fase('visitor'):
+        result = FileCSVVisitorImpl().visit(tree)
+
+    # analisis_calif imprime cada fila: se mide con la salida descartada
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        with fase('analisis_calif'):
+            calif = analisis_calif(result)
+
+    salida = f"{path}.salida.csv"
+    with fase('escritura'):
+        escribir_csv(salida, calif['header'], calif['rows'])
+    os.remove(salida)
+
+    total = sum(tiempos.values())
+    return {
+        'filas': filas,
+        'bytes': os.path.getsize(path),
+        'tokens': len(tokens.tokens),
+        'fases': fases,
+        'total': {
+            'segundos': total,
+            'filas_por_seg': filas / total if total else None,
+            'rss_pico_kb': _rss_pico_kb()
+        }
+    }
+
+
+def correr_suite(filas=FILAS, variantes=VARIANTES, directorio=None):
+    """
+    Genera cada archivo, lo mide en un proceso aparte y regresa el reporte completo
+    """
+    casos = []
+    with tempfile.TemporaryDirectory(dir=directorio) as carpeta:
+        for n in filas:
+            for variante in variantes:
+                path = os.path.join(carpeta, f"lista_{variante}_{n}.csv")
+                generar_lista(path, n, variante)
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    caso = pool.submit(correr_caso, path, n).result()
+                os.remove(path)
+                caso['variante'] = variante
+                casos.append(caso)
+                print(f"{variante:<10} {n:>10} filas  {caso['total']['segundos']:>9.2f} s  "
+                      f"{caso['total']['filas_por_seg']:>9.0f} filas/s  rss: {caso['total']['rss_pico_kb']} KB")
+
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'casos': casos
+    }
+
+
+def parse_args(argv):
+    arg_parser = argparse.ArgumentParser(description="Benchmark del pipeline CSV con listas de calificaciones sinteticas")
+    arg_parser.add_argument('--filas', type=int, nargs='+', default=list(FILAS),
+                            help="tamaños a medir (default: 1k, 10k y 50k)")
+    arg_parser.add_argument('--grandes', action='store_true',
+                            help="agrega 100k, 1M y 10M filas (el arbol de 1M ya no cabe en memoria en la "
+                                 "mayoria de los equipos y cada variante tarda horas)")
+    arg_parser.add_argument('--variantes', nargs='+', choices=VARIANTES, default=list(VARIANTES),
+                            help="variantes del archivo generado")
+    arg_parser.add_argument('--salida', default='benchmark.json',
+                            help="archivo JSON con los resultados")
+    arg_parser.add_argument('--dir', default=None,
+                            help="carpeta para los archivos generados (default: temporal del sistema)")
+    return arg_parser.parse_args(argv[1:])
+
+
+def main(argv):
+    args = parse_args(argv)
+    filas = args.filas + [n for n in FILAS_GRANDES if n not in args.filas] if args.grandes else args.filas
+    print("... BENCHMARK CSV ...\n")
+    reporte = correr_suite(filas, args.variantes, args.dir)
+    with open(args.salida, 'w', encoding='utf-8') as file:
+        json.dump(reporte, file, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en: {args.salida}")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
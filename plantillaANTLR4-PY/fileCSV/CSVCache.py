@@ -0,0 +1,166 @@
+import gc
+import hashlib
+import marshal
+import os
+import time
+
+from CSVLexer import serializedATN as lexer_atn
+from CSVParser import serializedATN as parser_atn
+from CSVEstadisticas import EstadisticasCSV
+
+# version del formato de los archivos de cache; cambiarla invalida todo lo guardado
+FORMATO_CACHE = 4
+# campos extra de algunos modos que se guardan con el resultado (tipos basicos de marshal)
+EXTRAS = ('prediccion',)
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'analizador_csv')
+MAX_BYTES = 256 * 1024 * 1024
+MAX_EDAD = 7 * 24 * 60 * 60  # segundos
+
+
+def grammar_version():
+    """
+    Huella de la gramatica: cambia si se regeneran CSVLexer/CSVParser desde otro CSV.g4
+    """
+    atn = ','.join(map(str, lexer_atn() + parser_atn()))
+    return hashlib.sha256(f"{FORMATO_CACHE}:{atn}".encode('ascii')).hexdigest()[:16]
+
+
+def leer_marshal(ruta):
+    """
+    Carga un archivo escrito con escribir_marshal (None si no existe o esta dañado)
+    """
+    # el recolector de basura no aporta nada mientras se crean millones de listas
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        with open(ruta, 'rb') as file:
+            return marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    finally:
+        if gc_activo:
+            gc.enable()
+
+
+def escribir_marshal(ruta, datos):
+    """
+    Escribe a un temporal y lo renombra para no dejar archivos a medias
+    """
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as file:
+        file.write(marshal.dumps(datos))
+    os.replace(temporal, ruta)
+
+
+class ParseCache:
+    """
+    Cache en disco del resultado del parseo (header, rows, total_fields, estadisticas y EXTRAS)
+
+    La llave es el hash del contenido mas el modo de parseo y la version de la
+    gramatica, asi un archivo sin cambios se carga sin volver a pasar por el
+    lexer y el parser. El modo va en la llave porque no todos dan lo mismo: por
+    ejemplo estricto falla con un archivo que rapido acepta recuperandose.
+    Los datos se guardan con marshal (binario compacto y rapido de leer).
+    """
+    def __init__(self, directorio=CACHE_DIR, max_bytes=MAX_BYTES, max_edad=MAX_EDAD):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.max_edad = max_edad
+        self.version = grammar_version()
+
+    def clave(self, input_text, modo='rapido'):
+        contenido = hashlib.sha256(input_text.encode('utf-8')).hexdigest()
+        return f"{contenido}-{modo}-{self.version}"
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.bin")
+
+    def get(self, input_text, modo='rapido'):
+        """
+        Resultado guardado para este contenido y modo o None si no esta (o no se puede leer)
+        """
+        ruta = self._ruta(self.clave(input_text, modo))
+        datos = leer_marshal(ruta)
+        if datos is None:
+            return None
+        header, rows, total_fields, estadisticas, extras = datos
+
+        # se marca como usado para que la limpieza saque primero lo menos reciente
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+
+        result = {
+            'header': header,
+            'rows': rows,
+            'total_fields': total_fields,
+            'estadisticas': EstadisticasCSV.desde_estado(estadisticas) if estadisticas is not None else None
+        }
+        result.update(extras)
+        return result
+
+    def put(self, input_text, result, modo='rapido'):
+        """
+        Guarda el resultado y aplica la limpieza por edad y tamaño
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self._ruta(self.clave(input_text, modo))
+        estadisticas = result.get('estadisticas')
+        extras = {campo: result[campo] for campo in EXTRAS if campo in result}
+        datos = (result['header'], list(result['rows']), result['total_fields'],
+                 estadisticas.estado() if estadisticas is not None else None, extras)
+
+        escribir_marshal(ruta, datos)
+        self.evict()
+
+    def _entradas(self):
+        entradas = []
+        try:
+            nombres = os.listdir(self.directorio)
+        except OSError:
+            return entradas
+        for nombre in nombres:
+            if not nombre.endswith('.bin'):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                stat = os.stat(ruta)
+            except OSError:
+                continue
+            entradas.append((stat.st_mtime, stat.st_size, ruta))
+        return entradas
+
+    def evict(self):
+        """
+        Borra las entradas mas viejas que max_edad y, si aun se pasa de max_bytes,
+        las usadas hace mas tiempo hasta quedar dentro del limite
+        """
+        ahora = time.time()
+        entradas = []
+        for mtime, size, ruta in self._entradas():
+            if ahora - mtime > self.max_edad:
+                self._borrar(ruta)
+            else:
+                entradas.append((mtime, size, ruta))
+
+        total = sum(size for _, size, _ in entradas)
+        for mtime, size, ruta in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            self._borrar(ruta)
+            total -= size
+
+    def limpiar(self):
+        """
+        Borra todo el cache
+        """
+        for _, _, ruta in self._entradas():
+            self._borrar(ruta)
+
+    def _borrar(self, ruta):
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
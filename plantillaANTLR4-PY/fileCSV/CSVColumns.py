@@ -0,0 +1,215 @@
+import math
+import sys
+from array import array
+
+# marca de celda vacia (o faltante) dentro de una columna numerica
+NAN = float('nan')
+
+
+def format_number(value):
+    """
+    Texto canonico de un numero: los enteros van sin decimales y NaN es vacio
+    """
+    if value != value:
+        return ""
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Column:
+    """
+    Columna compacta: array('d') mientras todo sea numerico, strings internados si no
+
+    Las celdas numericas cuyo texto no es el canonico (por ejemplo '7.0') guardan su
+    texto original en texts, asi cualquier fila se puede reconstruir tal cual.
+    """
+    __slots__ = ('numeric', 'values', 'texts', 'fmt')
+
+    def __init__(self, size=0):
+        self.numeric = True
+        self.values = array('d', [NAN]) * size
+        self.texts = {}
+        # formato fijo para columnas calculadas (CAL, RED)
+        self.fmt = None
+
+    def append(self, text):
+        """
+        Agrega una celda infiriendo el tipo una sola vez
+        """
+        if self.numeric:
+            if text == "":
+                self.values.append(NAN)
+                return
+            try:
+                value = float(text)
+            except ValueError:
+                value = NAN
+            if math.isfinite(value):
+                if format_number(value) != text:
+                    self.texts[len(self.values)] = text
+                self.values.append(value)
+                return
+            # primer valor no numerico: la columna pasa a ser de texto
+            self._to_text()
+        self.values.append(sys.intern(text))
+
+    def _to_text(self):
+        self.values = [sys.intern(self.text(i)) for i in range(len(self.values))]
+        self.numeric = False
+        self.texts = {}
+        self.fmt = None
+
+    def text(self, index):
+        """
+        Texto de la celda tal como venia en el CSV
+        """
+        if not self.numeric:
+            return self.values[index]
+        text = self.texts.get(index)
+        if text is not None:
+            return text
+        value = self.values[index]
+        if self.fmt and value == value:
+            return format(value, self.fmt)
+        return format_number(value)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class RowsView:
+    """
+    Vista de solo lectura que se comporta como la lista result['rows']
+    """
+    __slots__ = ('table',)
+
+    def __init__(self, table):
+        self.table = table
+
+    def __len__(self):
+        return self.table.row_count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.table.row_count
+        if not 0 <= index < self.table.row_count:
+            raise IndexError(index)
+        return self.table.row(index)
+
+    def __iter__(self):
+        row = self.table.row
+        for index in range(self.table.row_count):
+            yield row(index)
+
+
+class ColumnarCSV:
+    """
+    Resultado columnar y tipado del CSV: una Column por posicion del encabezado
+    """
+    def __init__(self):
+        self.header = None
+        self.columns = []
+        self.row_lengths = array('I')
+        self.row_count = 0
+        self.total_fields = 0
+        # ancho minimo de cada fila (columnas calculadas que se agregan al final)
+        self.min_width = 0
+        # EstadisticasCSV del parseo original (None si no se tiene)
+        self.estadisticas = None
+        # DiagnosticoCSV del modo diagnostico (None en los demas modos)
+        self.diagnostico = None
+        # etapa de prediccion del modo sll ('SLL' o 'LL'; None en los demas modos)
+        self.prediccion = None
+
+    @classmethod
+    def from_result(cls, result):
+        """
+        Convierte el resultado de cualquier modo de parseo (header/rows)
+        """
+        table = cls()
+        table.add_row(result['header'])
+        for row in result['rows']:
+            table.add_row(row)
+        table.estadisticas = result.get('estadisticas')
+        table.diagnostico = result.get('diagnostico')
+        table.prediccion = result.get('prediccion')
+        return table
+
+    def add_row(self, fields):
+        """
+        Agrega una fila; la primera se toma como encabezado (igual que el visitor)
+        """
+        self.total_fields += len(fields)
+        if self.header is None:
+            self.header = fields
+            return
+
+        columns = self.columns
+        while len(columns) < len(fields):
+            columns.append(Column(self.row_count))
+
+        for index, text in enumerate(fields):
+            columns[index].append(text)
+        # las celdas faltantes de filas cortas quedan vacias
+        for index in range(len(fields), len(columns)):
+            columns[index].append("")
+
+        self.row_lengths.append(len(fields))
+        self.row_count += 1
+
+    def column(self, index):
+        """
+        Column en la posicion indicada (None si ninguna fila llega hasta ahi)
+        """
+        return self.columns[index] if index < len(self.columns) else None
+
+    def row(self, index):
+        """
+        Reconstruye una fila como lista de strings
+        """
+        width = max(self.row_lengths[index], self.min_width)
+        columns = self.columns
+        return [columns[i].text(index) if i < len(columns) else "" for i in range(width)]
+
+    def with_columns(self, computed):
+        """
+        Copia que comparte las columnas originales y reemplaza las calculadas
+
+        computed es {indice: (array('d'), formato)}; las filas se extienden hasta
+        incluir esas columnas, igual que el relleno con "" de analisis_calif.
+        """
+        table = ColumnarCSV()
+        table.header = self.header
+        table.columns = list(self.columns)
+        table.row_lengths = self.row_lengths
+        table.row_count = self.row_count
+        table.total_fields = self.total_fields
+        table.min_width = self.min_width
+
+        for index, (values, fmt) in computed.items():
+            while len(table.columns) <= index:
+                table.columns.append(Column(self.row_count))
+            column = Column()
+            column.values = values
+            column.fmt = fmt
+            table.columns[index] = column
+            table.min_width = max(table.min_width, index + 1)
+        return table
+
+    def as_result(self):
+        """
+        Mismo formato que FileCSVVisitorImpl.data, con las filas como vista perezosa
+        """
+        result = {
+            'header': self.header,
+            'rows': RowsView(self),
+            'total_fields': self.total_fields,
+            'estadisticas': self.estadisticas,
+            'diagnostico': self.diagnostico,
+            'columnas': self
+        }
+        # igual que parse_two_stage: la llave solo existe en el modo sll
+        if self.prediccion is not None:
+            result['prediccion'] = self.prediccion
+        return result
@@ -0,0 +1,203 @@
+from collections import Counter
+
+from antlr4.Token import Token
+from antlr4.error.ErrorListener import ErrorListener
+from antlr4.error.ErrorStrategy import DefaultErrorStrategy
+from antlr4.IntervalSet import IntervalSet
+from CSVLexer import CSVLexer
+from CSVParser import CSVParser
+from FileCSVListenerImpl import FileCSVListenerImpl
+
+# errores que se listan uno por uno; los demas solo se cuentan (todos quedan en errores)
+LIMITE_ERRORES = 50
+# caracteres del texto del error que se muestran
+LARGO_TEXTO = 30
+
+TIPOS = {
+    'comilla_sin_cerrar': "comilla sin cerrar",
+    'comilla_suelta': "comilla suelta dentro del campo",
+    'sintaxis': "token inesperado",
+    'campos': "fila con otro numero de campos"
+}
+
+_SALTOS = (ord('\n'), ord('\r'), Token.EOF)
+# lo que puede seguir a un STRING bien cerrado
+_FIN_DE_CAMPO = (ord(','),) + _SALTOS
+
+def _recortar(texto):
+    texto = texto.split('\n', 1)[0].rstrip('\r')
+    return texto[:LARGO_TEXTO] + '...' if len(texto) > LARGO_TEXTO else texto
+
+
+class DiagnosticoCSV:
+    """
+    Errores encontrados en modo diagnostico: (linea, columna, tipo, detalle) en orden
+
+    La linea y la columna cuentan desde 1; tipo es una llave de TIPOS. Se guardan
+    todos los errores, solo la impresion se limita a `limite`.
+    """
+    def __init__(self, limite=LIMITE_ERRORES):
+        self.limite = limite
+        self.errores = []
+        self.por_tipo = Counter()
+        self.lineas_con_error = set()
+
+    @property
+    def total(self):
+        return len(self.errores)
+
+    def agregar(self, linea, columna, tipo, detalle):
+        self.errores.append((linea, columna, tipo, detalle))
+        self.por_tipo[tipo] += 1
+        self.lineas_con_error.add(linea)
+
+    def como_dict(self):
+        return {
+            'total': self.total,
+            'por_tipo': dict(self.por_tipo),
+            'errores': [{'linea': linea, 'columna': columna, 'tipo': tipo, 'detalle': detalle}
+                        for linea, columna, tipo, detalle in self.errores]
+        }
+
+    def lineas(self):
+        if not self.errores:
+            return ["Diagnostico: sin errores"]
+        lineas = [f"Error: linea {linea}, columna {columna}: {detalle}"
+                  for linea, columna, _, detalle in self.errores[:self.limite]]
+        if self.total > self.limite:
+            lineas.append(f"... {self.total - self.limite} errores mas sin mostrar")
+        conteo = ', '.join(f"{TIPOS[tipo]}: {veces}" for tipo, veces in self.por_tipo.most_common())
+        lineas.append(f"Errores de diagnostico: {self.total} ({conteo})")
+        return lineas
+
+
+class LexerDiagnostico(CSVLexer):
+    """
+    CSVLexer que anota las comillas mal puestas y se resincroniza en el siguiente salto de linea
+
+    Todos los errores del lexer son de comillas: TEXT acepta todo lo demas. Un
+    STRING sin pareja se busca hasta el final del archivo y antlr deja la entrada
+    ahi, perdiendo el resto; un STRING pegado a texto (comilla a media celda o
+    una comilla sin cerrar que encontro la de otra fila) se traga las filas que
+    hay entre las dos comillas. En ambos casos se regresa al inicio del token y
+    se salta solo lo que queda de su linea. Cada busqueda fallida termina en la
+    comilla siguiente, que despues se vuelve a leer una sola vez, asi el costo
+    total sigue siendo lineal aunque haya muchos errores.
+    """
+    def __init__(self, input_stream, diagnostico):
+        super().__init__(input_stream)
+        self.diagnostico = diagnostico
+        self._anterior = None
+
+    def nextToken(self):
+        token = super().nextToken()
+        if token.type == CSVParser.STRING:
+            tipo = None
+            if self._anterior == CSVParser.TEXT:
+                tipo = 'comilla_suelta'
+            elif self._input.LA(1) not in _FIN_DE_CAMPO:
+                # si cruzo lineas, la comilla que abre es la que no tenia pareja
+                tipo = 'comilla_sin_cerrar' if '\n' in token.text else 'comilla_suelta'
+            if tipo is not None:
+                self._anotar(tipo, token.line, token.column, token.text)
+                self._saltar_linea(token.start, token.line, token.column)
+                token = super().nextToken()
+        self._anterior = token.type
+        return token
+
+    def _anotar(self, tipo, linea, columna, texto):
+        self.diagnostico.agregar(linea, columna + 1, tipo, f"{TIPOS[tipo]}: '{_recortar(texto)}'")
+
+    def _saltar_linea(self, inicio, linea, columna):
+        self._input.seek(inicio)
+        self._interp.line = linea
+        self._interp.column = columna
+        # el salto de linea se deja para que el parser cierre la fila
+        while self._input.LA(1) not in _SALTOS:
+            self._interp.consume(self._input)
+
+    def notifyListeners(self, e):
+        # solo el inicio del texto: una comilla sin pareja llega hasta el final del archivo
+        start = self._tokenStartCharIndex
+        texto = self._input.getText(start, min(self._input.index, start + LARGO_TEXTO * 4))
+        # con TEXT o STRING antes, la comilla esta a media celda
+        tipo = 'comilla_suelta' if self._anterior in (CSVParser.TEXT, CSVParser.STRING) else 'comilla_sin_cerrar'
+        self._anotar(tipo, self._tokenStartLine, self._tokenStartColumn, texto)
+
+    def recover(self, re):
+        self._saltar_linea(self._tokenStartCharIndex, self._tokenStartLine, self._tokenStartColumn)
+
+
+class EstrategiaDiagnostico(DefaultErrorStrategy):
+    """
+    DefaultErrorStrategy que al recuperarse solo salta hasta el siguiente salto de linea
+
+    La recuperacion por omision busca en los follow de toda la pila de reglas;
+    aqui basta con terminar la fila, asi un error nunca descarta filas siguientes.
+    """
+    def __init__(self):
+        super().__init__()
+        self._recuperacion = IntervalSet()
+        self._recuperacion.addOne(CSVParser.T__1)
+        self._recuperacion.addOne(Token.EOF)
+
+    def getErrorRecoverySet(self, recognizer):
+        return self._recuperacion
+
+
+class ErroresParser(ErrorListener):
+    """
+    Anota en el diagnostico cada error que reporta el parser
+
+    Las comillas ya las anota LexerDiagnostico; aqui llegan los demas tokens
+    fuera de lugar (por ejemplo un retorno de carro sin salto de linea).
+    """
+    def __init__(self, diagnostico):
+        self.diagnostico = diagnostico
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        token = offendingSymbol
+        if token.type == Token.EOF and recognizer._ctx.getRuleIndex() == CSVParser.RULE_csvFile:
+            # falta el salto de linea final que exige CSV.g4 (ver parse_two_stage): no es error
+            return
+        texto = '<EOF>' if token.type == Token.EOF else token.text[:LARGO_TEXTO]
+        self.diagnostico.agregar(line, column + 1, 'sintaxis', f"{TIPOS['sintaxis']} {texto!r}")
+
+
+class ListenerDiagnostico(FileCSVListenerImpl):
+    """
+    FileCSVListenerImpl que ademas anota las filas con otro numero de campos que el encabezado
+
+    Una fila se revisa hasta que empieza la siguiente (o termina el archivo): el
+    parser puede reportar el error de una fila despues de cerrarla, y las filas
+    de una linea que ya tiene un error de sintaxis no se anotan otra vez.
+    """
+    def __init__(self, diagnostico, on_row=None, con_encabezado=True, por_columna=False):
+        super().__init__(on_row, con_encabezado, por_columna)
+        self.diagnostico = diagnostico
+        self._ancho = None
+        self._pendiente = None
+
+    def exitRow(self, ctx):
+        campos = len(self._fields)
+        super().exitRow(ctx)
+        if self._ancho is None:
+            self._ancho = campos
+        elif campos != self._ancho:
+            self._pendiente = (ctx.start.line, self.estadisticas.filas, campos)
+
+    def enterRow(self, ctx):
+        self._revisar_pendiente()
+        super().enterRow(ctx)
+
+    def exitCsvFile(self, ctx):
+        self._revisar_pendiente()
+
+    def _revisar_pendiente(self):
+        if self._pendiente is None:
+            return
+        linea, fila, campos = self._pendiente
+        self._pendiente = None
+        if linea not in self.diagnostico.lineas_con_error:
+            self.diagnostico.agregar(linea, 1, 'campos',
+                                     f"la fila {fila} tiene {campos} campos y el encabezado {self._ancho}")
@@ -0,0 +1,237 @@
+import math
+from itertools import repeat
+from operator import mul, sub
+
+# celdas que se juntan por columna antes de convertirlas y sumarlas a las estadisticas
+CELDAS_POR_LOTE = 1024
+
+
+class EstadisticaColumna:
+    """
+    No vacios, numericos, minimo, maximo, promedio y varianza de una columna
+
+    Las celdas se juntan en lotes de CELDAS_POR_LOTE; cada lote se convierte con
+    map(float) y se resume con min/max/sum y sus diferencias contra la media del
+    lote, todo en funciones nativas. El promedio y la varianza se suman a lo
+    acumulado con la forma por lotes de Welford (formula de Chan), sin guardar
+    los valores ni perder precision con sumas grandes.
+    """
+    __slots__ = ('no_vacios', 'numericos', 'minimo', 'maximo', 'media', 'm2', 'celdas')
+
+    def __init__(self):
+        self.no_vacios = 0
+        self.numericos = 0
+        self.minimo = None
+        self.maximo = None
+        self.media = 0.0
+        # suma de los cuadrados de las diferencias contra la media
+        self.m2 = 0.0
+        # celdas no vacias que aun no se suman (ver _vaciar)
+        self.celdas = []
+
+    def agregar(self, texto):
+        """
+        Cuenta una celda; las vacias no cuentan y las que no son numero solo como no vacias
+        """
+        if texto == "":
+            return
+        self.celdas.append(texto)
+        if len(self.celdas) >= CELDAS_POR_LOTE:
+            self._vaciar()
+
+    def _vaciar(self):
+        celdas = self.celdas
+        if not celdas:
+            return
+        self.celdas = []
+        self.no_vacios += len(celdas)
+        try:
+            valores = list(map(float, celdas))
+        except ValueError:
+            # columna con texto: se convierte celda por celda
+            valores = []
+            for celda in celdas:
+                try:
+                    valores.append(float(celda))
+                except ValueError:
+                    pass
+        # 'nan' o 'inf' escritos en el CSV se toman como texto (igual que en ColumnarCSV)
+        valores = list(filter(math.isfinite, valores))
+        if not valores:
+            return
+        n = len(valores)
+        media = sum(valores) / n
+        diferencias = list(map(sub, valores, repeat(media)))
+        self._sumar(n, min(valores), max(valores), media, sum(map(mul, diferencias, diferencias)))
+
+    def _sumar(self, n, minimo, maximo, media, m2):
+        if not self.numericos:
+            self.numericos, self.minimo, self.maximo, self.media, self.m2 = n, minimo, maximo, media, m2
+            return
+        total = self.numericos + n
+        delta = media - self.media
+        self.media += delta * n / total
+        self.m2 += m2 + delta * delta * self.numericos * n / total
+        self.numericos = total
+        self.minimo = min(self.minimo, minimo)
+        self.maximo = max(self.maximo, maximo)
+
+    @property
+    def varianza(self):
+        """
+        Varianza poblacional de los valores numericos (None si no hay)
+        """
+        self._vaciar()
+        return self.m2 / self.numericos if self.numericos else None
+
+    @property
+    def desviacion(self):
+        varianza = self.varianza
+        return math.sqrt(varianza) if varianza is not None else None
+
+    def combinar(self, otra):
+        """
+        Suma a esta columna lo acumulado en otra
+        """
+        self._vaciar()
+        otra._vaciar()
+        self.no_vacios += otra.no_vacios
+        if otra.numericos:
+            self._sumar(otra.numericos, otra.minimo, otra.maximo, otra.media, otra.m2)
+
+    def estado(self):
+        self._vaciar()
+        return (self.no_vacios, self.numericos, self.minimo, self.maximo, self.media, self.m2)
+
+    def restaurar(self, estado):
+        self.no_vacios, self.numericos, self.minimo, self.maximo, self.media, self.m2 = estado
+        self.celdas = []
+
+    def describir(self):
+        """
+        Texto corto con lo acumulado (sin el nombre de la columna)
+        """
+        self._vaciar()
+        texto = f"{self.no_vacios} no vacios, {self.numericos} numericos"
+        if self.numericos:
+            texto += (f", minimo {self.minimo:g}, maximo {self.maximo:g}, "
+                      f"promedio {self.media:.2f}, desviacion {self.desviacion:.2f}")
+        return texto
+
+
+class EstadisticasCSV:
+    """
+    Conteos del CSV y estadisticas por columna, acumulados mientras se arman las filas
+
+    El parser (visitor, listener o escaner) llama agregar_fila con cada fila en
+    cuanto la termina, asi los reportes no vuelven a recorrer result['rows'].
+    Con con_encabezado la primera fila cuenta en filas, campos y vacios pero no
+    en las columnas (sus textos son los nombres). Se puede combinar con otro
+    acumulador del resto del archivo (bloques en paralelo o el parseo incremental).
+    Las estadisticas por columna convierten cada celda con float(); con
+    por_columna=False solo se llevan los conteos (los parsers las piden solo
+    cuando el reporte las va a mostrar).
+    """
+    def __init__(self, con_encabezado=True, por_columna=True):
+        self.filas = 0
+        self.campos = 0
+        self.vacios = 0
+        # campos de la fila mas larga (ancho para la validacion)
+        self.ancho = 0
+        self.encabezado = None
+        self.por_columna = por_columna
+        self.columnas = []
+        self._falta_encabezado = con_encabezado
+
+    @classmethod
+    def de_filas(cls, rows, con_encabezado=True):
+        """
+        Acumulador armado recorriendo filas ya parseadas (cuando el parser no lo lleno)
+        """
+        estadisticas = cls(con_encabezado)
+        for row in rows:
+            estadisticas.agregar_fila(row)
+        return estadisticas
+
+    def agregar_fila(self, fields):
+        self.filas += 1
+        self.campos += len(fields)
+        self.vacios += fields.count("")
+        if len(fields) > self.ancho:
+            self.ancho = len(fields)
+        if self._falta_encabezado:
+            self.encabezado = fields
+            self._falta_encabezado = False
+            return
+        if not self.por_columna:
+            return
+
+        columnas = self.columnas
+        if len(columnas) < len(fields):
+            columnas.extend(EstadisticaColumna() for _ in range(len(fields) - len(columnas)))
+        # mismo trabajo que EstadisticaColumna.agregar, sin una llamada por celda
+        for columna, field in zip(columnas, fields):
+            if field:
+                celdas = columna.celdas
+                celdas.append(field)
+                if len(celdas) >= CELDAS_POR_LOTE:
+                    columna._vaciar()
+
+    def combinar(self, otro):
+        """
+        Agrega lo acumulado por otro sobre las filas que siguen a las de este
+
+        Si alguno de los dos no llevaba estadisticas por columna, el resultado tampoco.
+        """
+        self.filas += otro.filas
+        self.campos += otro.campos
+        self.vacios += otro.vacios
+        self.ancho = max(self.ancho, otro.ancho)
+        if self.encabezado is None:
+            self.encabezado = otro.encabezado
+        self._falta_encabezado = self._falta_encabezado and otro._falta_encabezado
+        if not (self.por_columna and otro.por_columna):
+            self.por_columna = False
+            self.columnas = []
+            return self
+        for indice, columna in enumerate(otro.columnas):
+            if indice < len(self.columnas):
+                self.columnas[indice].combinar(columna)
+            else:
+                copia = EstadisticaColumna()
+                copia.restaurar(columna.estado())
+                self.columnas.append(copia)
+        return self
+
+    def estado(self):
+        """
+        Tupla de tipos basicos (se guarda con marshal en el cache); columnas es None sin por_columna
+        """
+        columnas = [columna.estado() for columna in self.columnas] if self.por_columna else None
+        return (self.filas, self.campos, self.vacios, self.ancho, self.encabezado, self._falta_encabezado, columnas)
+
+    @classmethod
+    def desde_estado(cls, estado):
+        filas, campos, vacios, ancho, encabezado, falta_encabezado, columnas = estado
+        estadisticas = cls(falta_encabezado, columnas is not None)
+        estadisticas.filas = filas
+        estadisticas.campos = campos
+        estadisticas.vacios = vacios
+        estadisticas.ancho = ancho
+        estadisticas.encabezado = encabezado
+        for estado_columna in columnas or ():
+            columna = EstadisticaColumna()
+            columna.restaurar(estado_columna)
+            estadisticas.columnas.append(columna)
+        return estadisticas
+
+    def nombre(self, indice):
+        """
+        Columna N (nombre del encabezado); los nombres se repiten o faltan en las listas
+        """
+        if self.encabezado and indice < len(self.encabezado) and self.encabezado[indice]:
+            return f"Columna {indice + 1} ({self.encabezado[indice]})"
+        return f"Columna {indice + 1}"
+
+    def lineas(self):
+        return [f"{self.nombre(indice)}: {columna.describir()}" for indice, columna in enumerate(self.columnas)]
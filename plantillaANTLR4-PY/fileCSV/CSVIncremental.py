@@ -0,0 +1,101 @@
+import hashlib
+import os
+
+from CSVParsing import parse_csv
+from CSVCache import CACHE_DIR, grammar_version, leer_marshal, escribir_marshal
+from CSVEstadisticas import EstadisticasCSV
+
+
+def ultimo_registro(data):
+    """
+    Posicion (en bytes) justo despues del ultimo salto de linea fuera de comillas
+
+    data debe empezar en el inicio de un registro; 0 si aun no hay registro completo.
+    """
+    end = data.rfind(b'\n')
+    if end == -1:
+        return 0
+    # comillas antes del salto; impar = el salto esta dentro de un STRING
+    quotes = data.count(b'"', 0, end)
+    while quotes % 2:
+        previous = data.rfind(b'\n', 0, end)
+        if previous == -1:
+            return 0
+        quotes -= data.count(b'"', previous, end)
+        end = previous
+    return end + 1
+
+
+def _parse_rows(text, modo, con_encabezado, **opciones):
+    """
+    Filas del texto y sus estadisticas; con_encabezado solo si el texto empieza el archivo
+    """
+    if not text:
+        return [], EstadisticasCSV(con_encabezado)
+    result = parse_csv(text, modo, con_encabezado=con_encabezado, **opciones)
+    return [result['header']] + list(result['rows']), result['estadisticas']
+
+
+class IncrementalParser:
+    """
+    Parseo incremental para archivos que solo crecen al final
+
+    Por cada archivo guarda el ultimo byte parseado por completo (fin del ultimo
+    registro), el hash de todo lo anterior, las filas que produjo y sus estadisticas
+    (EstadisticasCSV, que se siguen acumulando con lo nuevo). En la siguiente
+    corrida solo se parsea lo que se agrego; si el contenido previo cambio se
+    vuelve a parsear desde el inicio.
+    """
+    def __init__(self, directorio=CACHE_DIR):
+        self.directorio = directorio
+        self.version = grammar_version()
+
+    def _ruta(self, path):
+        clave = hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()
+        return os.path.join(self.directorio, f"inc-{clave}.bin")
+
+    def parse(self, path, modo='rapido', **opciones):
+        """
+        Regresa (result, tipo, filas_nuevas); tipo es 'incremental' o 'completo'
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        view = memoryview(data)
+
+        ruta = self._ruta(path)
+        estado = leer_marshal(ruta)
+        rows, offset, estadisticas = [], 0, EstadisticasCSV()
+        tipo = 'completo'
+        if estado is not None:
+            version, offset_previo, prefix_hash, rows_previas, estado_estadisticas = estado
+            if (version == self.version and offset_previo <= len(data)
+                    and hashlib.sha256(view[:offset_previo]).hexdigest() == prefix_hash):
+                rows, offset = rows_previas, offset_previo
+                estadisticas = EstadisticasCSV.desde_estado(estado_estadisticas)
+                tipo = 'incremental'
+
+        # solo se confirman registros completos; el resto se vuelve a leer la proxima vez
+        tail = data[offset:]
+        boundary = ultimo_registro(tail)
+        nuevas, parciales = _parse_rows(tail[:boundary].decode('utf-8'), modo, not rows, **opciones)
+        if nuevas or tipo == 'completo':
+            rows.extend(nuevas)
+            estadisticas.combinar(parciales)
+            offset += boundary
+            os.makedirs(self.directorio, exist_ok=True)
+            prefix_hash = hashlib.sha256(view[:offset]).hexdigest()
+            escribir_marshal(ruta, (self.version, offset, prefix_hash, rows, estadisticas.estado()))
+
+        pendientes, parciales = _parse_rows(tail[boundary:].decode('utf-8'), modo, not rows, **opciones)
+        all_rows = rows + pendientes if pendientes else rows
+        if pendientes:
+            # lo pendiente no se guarda: se suma sobre una copia
+            estadisticas = EstadisticasCSV.desde_estado(estadisticas.estado()).combinar(parciales)
+
+        result = {
+            'header': all_rows[0] if all_rows else None,
+            'rows': all_rows[1:],
+            'total_fields': estadisticas.campos,
+            'estadisticas': estadisticas
+        }
+        return result, tipo, len(nuevas) + len(pendientes)
@@ -0,0 +1,146 @@
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr
+
+from CSVParsing import parse_csv, parse_columns, contar_filas
+from CalifEngine import calcular_columnas
+from CalifFormula import EsquemaCalif
+from CSVSalida import EscritorCSV, ruta_salida
+from CSVValidacion import VALIDACION_DEFAULT
+
+_COMODINES = ('*', '?', '[')
+
+
+def expandir_rutas(patrones):
+    """
+    Lista de archivos a partir de rutas, globs y carpetas
+
+    Las carpetas aportan sus *.csv (incluidas subcarpetas) y los globs se
+    expanden; cada grupo va ordenado y se respeta el orden de los argumentos,
+    asi la misma linea de comandos siempre da la misma lista. Una ruta que no
+    existe se deja tal cual para que se reporte como error.
+    """
+    rutas = []
+    for patron in patrones:
+        if os.path.isdir(patron):
+            encontrados = sorted(glob.glob(os.path.join(patron, '**', '*.csv'), recursive=True))
+        elif any(c in patron for c in _COMODINES):
+            encontrados = sorted(p for p in glob.glob(patron, recursive=True) if os.path.isfile(p))
+        else:
+            encontrados = [patron]
+        rutas.extend(encontrados)
+    # sin repetidos, conservando el primer lugar donde aparece cada archivo
+    return list(dict.fromkeys(rutas))
+
+
+def es_lote(patrones):
+    """
+    True si los argumentos piden mas de un archivo (varias rutas, un glob o una carpeta)
+    """
+    return len(patrones) > 1 or any(os.path.isdir(p) or any(c in p for c in _COMODINES) for p in patrones)
+
+
+def rutas_salida(rutas, carpeta):
+    """
+    Archivo de salida de cada entrada dentro de carpeta, sin repetir nombres
+
+    Dos entradas con el mismo nombre (de carpetas distintas) reciben _2, _3, ...
+    en el orden de rutas, asi la asignacion no depende de que proceso termine antes.
+    """
+    salidas = []
+    usados = set()
+    for path in rutas:
+        destino = ruta_salida(os.path.join(carpeta, ''), path)
+        base, extension = os.path.splitext(destino)
+        n = 1
+        while destino in usados:
+            n += 1
+            destino = f"{base}_{n}{extension}"
+        usados.add(destino)
+        salidas.append(destino)
+    return salidas
+
+
+def resumen_archivo(path, modo='rapido', columnar=False, esquema=None, salida=None, validacion=VALIDACION_DEFAULT):
+    """
+    Analiza un archivo sin imprimir nada y regresa su resumen (trabajo de cada proceso)
+
+    Las advertencias de validacion y lo que el parser imprima se cuentan como
+    advertencias para que la salida de varios procesos no se mezcle. Con salida
+    el CSV calificado se escribe ahi fila por fila.
+    """
+    resumen = {
+        'archivo': path,
+        'filas': 0,
+        'columnas': 0,
+        'campos': 0,
+        'calificadas': None,
+        'advertencias': 0,
+        'salida': None,
+        'error': None
+    }
+    inicio = time.perf_counter()
+    capturado = io.StringIO()
+    try:
+        with redirect_stdout(capturado), redirect_stderr(capturado):
+            with open(path, 'r', encoding='utf-8') as file:
+                content = file.read()
+            if not content.strip():
+                raise ValueError("Archivo vacio")
+
+            if columnar:
+                result = parse_columns(content, modo).as_result()
+            else:
+                result = parse_csv(content, modo)
+            resumen['filas'] = contar_filas(result)
+            resumen['columnas'] = len(result['header']) if result['header'] else 0
+            resumen['campos'] = result['total_fields']
+            if validacion is not None:
+                resumen['advertencias'] = validacion.validar(result).total
+            if result.get('diagnostico') is not None:
+                resumen['advertencias'] += result['diagnostico'].total
+
+            evaluador = (esquema or EsquemaCalif()).compilar(result['header']) if result['header'] else None
+            if evaluador is not None:
+                if 'columnas' in result:
+                    computed = calcular_columnas(result['columnas'], evaluador)
+                    processed_rows = result['columnas'].with_columns(computed).as_result()['rows']
+                else:
+                    processed_rows = (evaluador.fila(row) for row in result['rows'])
+                if salida:
+                    with EscritorCSV(salida) as escritor:
+                        escritor.write_row(result['header'])
+                        for row in processed_rows:
+                            escritor.write_row(row)
+                    resumen['salida'] = salida
+                else:
+                    for _ in processed_rows:
+                        pass
+                resumen['calificadas'] = len(result['rows'])
+    except Exception as error:
+        resumen['error'] = str(error) or type(error).__name__
+
+    resumen['advertencias'] += sum(1 for linea in capturado.getvalue().splitlines() if linea.strip())
+    resumen['segundos'] = time.perf_counter() - inicio
+    return resumen
+
+
+def _resumen_args(args):
+    return resumen_archivo(*args)
+
+
+def analizar_lote(rutas, modo='rapido', columnar=False, esquema=None, workers=None, carpeta_salida=None,
+                  validacion=VALIDACION_DEFAULT):
+    """
+    Reparte los archivos en un ProcessPoolExecutor; los resumenes salen en el orden de rutas
+    """
+    salidas = rutas_salida(rutas, carpeta_salida) if carpeta_salida else [None] * len(rutas)
+    trabajos = [(path, modo, columnar, esquema, salida, validacion) for path, salida in zip(rutas, salidas)]
+    if len(trabajos) <= 1 or workers == 1:
+        return [_resumen_args(trabajo) for trabajo in trabajos]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        # map conserva el orden aunque los archivos terminen en otro orden
+        return list(executor.map(_resumen_args, trabajos))
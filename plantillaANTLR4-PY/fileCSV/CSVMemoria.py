@@ -0,0 +1,62 @@
+import sys
+import time
+import tracemalloc
+
+from CSVParsing import parse_listener, parse_unbuffered
+from CSVMmapStream import MmapCharStream
+
+# pipelines que se comparan: mismo listener, distinto TokenStream
+PIPELINES = {
+    'CommonTokenStream': parse_listener,
+    'UnbufferedTokenStream': parse_unbuffered
+}
+
+
+def pico_memoria(funcion, *args, **kwargs):
+    """
+    Ejecuta funcion y regresa (resultado, pico de memoria en bytes)
+
+    El pico es lo que python asigno durante la llamada (tracemalloc), sin contar
+    lo que ya estaba en memoria antes.
+    """
+    tracemalloc.start()
+    try:
+        result = funcion(*args, **kwargs)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, pico
+
+
+def medir_pipeline(path, funcion):
+    """
+    Parsea el archivo mapeado contando filas sin guardarlas; regresa (filas, pico, segundos)
+    """
+    filas = 0
+
+    def contar(fields):
+        nonlocal filas
+        filas += 1
+
+    with MmapCharStream(path) as stream:
+        inicio = time.perf_counter()
+        _, pico = pico_memoria(funcion, stream, on_row=contar)
+        segundos = time.perf_counter() - inicio
+    return filas, pico, segundos
+
+
+def comparar_pipelines(path):
+    """
+    Imprime el pico de memoria de cada pipeline de tokens para el mismo archivo
+    """
+    print(f"... MEMORIA PICO: {path} ...\n")
+    for nombre, funcion in PIPELINES.items():
+        filas, pico, segundos = medir_pipeline(path, funcion)
+        print(f"{nombre:<22} filas: {filas:>10}  pico: {pico / 2**20:>10.2f} MB  tiempo: {segundos:>8.2f} s")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Uso: python CSVMemoria.py archivo.csv")
+        sys.exit(1)
+    comparar_pipelines(sys.argv[1])
@@ -0,0 +1,88 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+class Metricas:
+    """
+    Tiempos por fase de una corrida: segundos, filas/s, bytes/s y tokens
+
+    Cada fase se mide con un solo par de perf_counter() al entrar y salir, no
+    por fila, asi el costo es el mismo sin importar el tamaño del archivo.
+
+        metricas = Metricas(bytes_entrada)
+        with metricas.fase('parser') as fase:
+            ...
+            fase['filas'] = 1234
+    """
+    def __init__(self, bytes_entrada=0, modo=None):
+        self.bytes_entrada = bytes_entrada
+        self.modo = modo
+        self.fases = {}
+
+    @contextmanager
+    def fase(self, nombre):
+        datos = {'filas': None, 'tokens': None}
+        inicio = time.perf_counter()
+        try:
+            yield datos
+        finally:
+            datos['segundos'] = time.perf_counter() - inicio
+            self.fases[nombre] = datos
+
+    def _con_tasas(self, segundos, filas, tokens):
+        return {
+            'segundos': segundos,
+            'filas': filas,
+            'tokens': tokens,
+            'filas_por_seg': filas / segundos if filas is not None and segundos else None,
+            'bytes_por_seg': self.bytes_entrada / segundos if segundos else None
+        }
+
+    def como_dict(self):
+        """
+        Resumen serializable a JSON
+
+        Las filas de la corrida son las de la ultima fase que las conto; las fases
+        que no las cuentan (lexer, parser) usan ese total para sus filas/s.
+        """
+        filas = next((d['filas'] for d in reversed(self.fases.values()) if d['filas'] is not None), None)
+        tokens = next((d['tokens'] for d in self.fases.values() if d['tokens'] is not None), None)
+        fases = {nombre: self._con_tasas(d['segundos'], d['filas'] if d['filas'] is not None else filas, d['tokens'])
+                 for nombre, d in self.fases.items()}
+        total = self._con_tasas(sum(d['segundos'] for d in fases.values()), filas, tokens)
+        return {
+            'modo': self.modo,
+            'bytes': self.bytes_entrada,
+            'fases': fases,
+            'total': total
+        }
+
+    def como_json(self):
+        return json.dumps(self.como_dict(), indent=2, ensure_ascii=False)
+
+    def como_texto(self):
+        """
+        Tabla legible con una linea por fase
+        """
+        def tasa(valor, unidad):
+            return f"{valor:>12,.0f} {unidad}" if valor is not None else f"{'-':>12} {unidad}"
+
+        resumen = self.como_dict()
+        lineas = []
+        for nombre, d in list(resumen['fases'].items()) + [('total', resumen['total'])]:
+            lineas.append(f"{nombre:<15} {d['segundos']:>9.4f} s  {tasa(d['filas_por_seg'], 'filas/s')}  "
+                          f"{tasa(d['bytes_por_seg'], 'bytes/s')}  tokens: {d['tokens'] if d['tokens'] is not None else '-'}")
+        return '\n'.join(lineas)
+
+
+class _SinMetricas:
+    """
+    Mismo uso que Metricas pero sin medir nada (lo que se usa por default)
+    """
+    @contextmanager
+    def fase(self, nombre):
+        yield {}
+
+
+SIN_METRICAS = _SinMetricas()
@@ -0,0 +1,176 @@
+import mmap
+import re
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+from antlr4.Token import Token
+
+# bytes que se decodifican a la vez
+VENTANA = 1 << 16
+# ventanas decodificadas que se conservan (la actual del lexer y las de getText)
+VENTANAS_EN_MEMORIA = 4
+
+# bytes de continuacion de UTF-8 (10xxxxxx): no inician caracter
+_CONTINUACION = bytes(range(0x80, 0xC0))
+_CONTENIDO = re.compile(rb'\S')
+
+
+class MmapCharStream:
+    """
+    CharStream de antlr4 sobre un mmap del archivo, decodificado por ventanas
+
+    Reemplaza a InputStream (que guarda el texto y una lista con el ord() de cada
+    caracter): aqui solo se decodifican unas cuantas ventanas de VENTANA bytes a
+    la vez, asi el lexer recorre archivos de varios GB sin copiarlos completos.
+    Los indices son de caracteres, igual que en InputStream.
+    """
+    def __init__(self, path, ventana=VENTANA, encoding='utf-8'):
+        self.name = path
+        self.encoding = encoding
+        self._ventana = ventana
+        self._file = open(path, 'rb')
+        try:
+            # mmap no acepta archivos vacios
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._mmap = b''
+        self._length = len(self._mmap)
+
+        # inicio (en bytes y en caracteres) de cada ventana ya descubierta
+        self._byte_starts = array('q', [0])
+        self._char_starts = array('q', [0])
+        self._cache = OrderedDict()
+        self._size = None
+
+        self._index = 0
+        # ventana donde esta el lexer
+        self._text = ''
+        self._start = 0
+
+    def close(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _fin(self, byte_start):
+        # la ventana termina en inicio de caracter para no partir una secuencia UTF-8
+        end = min(byte_start + self._ventana, self._length)
+        while end < self._length and self._mmap[end] in _CONTINUACION:
+            end -= 1
+        return end
+
+    def _decodificar(self, k):
+        text = self._cache.get(k)
+        if text is not None:
+            self._cache.move_to_end(k)
+            return text
+        start = self._byte_starts[k]
+        text = self._mmap[start:self._fin(start)].decode(self.encoding)
+        self._cache[k] = text
+        if len(self._cache) > VENTANAS_EN_MEMORIA:
+            self._cache.popitem(last=False)
+        return text
+
+    def _ventana_de(self, pos):
+        """
+        (texto, caracter inicial) de la ventana que contiene pos; None al final del archivo
+        """
+        k = bisect_right(self._char_starts, pos) - 1
+        while True:
+            text = self._decodificar(k)
+            if pos < self._char_starts[k] + len(text):
+                return text, self._char_starts[k]
+            if k + 1 < len(self._byte_starts):
+                k += 1
+                continue
+            # se descubre la siguiente ventana (el lexer avanza en orden)
+            byte_end = self._fin(self._byte_starts[k])
+            if byte_end >= self._length:
+                return None
+            self._byte_starts.append(byte_end)
+            self._char_starts.append(self._char_starts[k] + len(text))
+            k += 1
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def size(self):
+        # numero de caracteres: bytes que no son de continuacion, por bloques
+        if self._size is None:
+            size = 0
+            for start in range(0, self._length, self._ventana):
+                chunk = self._mmap[start:start + self._ventana]
+                size += len(chunk.translate(None, _CONTINUACION))
+            self._size = size
+        return self._size
+
+    def reset(self):
+        self._index = 0
+
+    def consume(self):
+        if self.LA(1) == Token.EOF:
+            raise Exception("cannot consume EOF")
+        self._index += 1
+
+    def LA(self, offset):
+        if offset == 0:
+            return 0  # indefinido
+        if offset < 0:
+            offset += 1  # LA(-1) es el caracter anterior
+        pos = self._index + offset - 1
+        i = pos - self._start
+        if 0 <= i < len(self._text):
+            return ord(self._text[i])
+        if pos < 0:
+            return Token.EOF
+        ventana = self._ventana_de(pos)
+        if ventana is None:
+            return Token.EOF
+        self._text, self._start = ventana
+        return ord(self._text[pos - self._start])
+
+    def LT(self, offset):
+        return self.LA(offset)
+
+    # mark/release no hacen nada: cualquier posicion se puede volver a decodificar
+    def mark(self):
+        return -1
+
+    def release(self, marker):
+        pass
+
+    def seek(self, index):
+        if index <= self._index:
+            self._index = index
+            return
+        self._index = min(index, self.size)
+
+    def getText(self, start, stop):
+        parts = []
+        pos = start
+        while pos <= stop:
+            ventana = self._ventana_de(pos)
+            if ventana is None:
+                break
+            text, inicio = ventana
+            parts.append(text[pos - inicio:stop + 1 - inicio])
+            pos = inicio + len(text)
+        return ''.join(parts)
+
+    def tiene_contenido(self):
+        """
+        True si el archivo tiene algo ademas de espacios y saltos de linea
+        """
+        return _CONTENIDO.search(self._mmap) is not None
+
+    def __str__(self):
+        return self.name
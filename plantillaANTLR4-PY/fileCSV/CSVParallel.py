@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from CSVParsing import parse_tree
+
+# tamaño aproximado (en caracteres) de cada bloque que se manda a un proceso
+CHUNK_SIZE = 1 << 20
+
+
+def split_chunks(input_text, chunk_size=CHUNK_SIZE):
+    """
+    Corta el texto en bloques que terminan en un salto de linea fuera de comillas
+    """
+    chunks = []
+    n = len(input_text)
+    start = 0
+    # comillas vistas desde el inicio del bloque actual; impar = dentro de un STRING
+    quotes = 0
+
+    while start < n:
+        cut = start + chunk_size
+        if cut >= n:
+            chunks.append(input_text[start:])
+            break
+
+        scanned = start
+        while True:
+            newline = input_text.find('\n', cut)
+            if newline == -1:
+                newline = n - 1
+            quotes += input_text.count('"', scanned, newline + 1)
+            scanned = newline + 1
+            if quotes % 2 == 0 or scanned >= n:
+                break
+            cut = scanned
+
+        chunks.append(input_text[start:scanned])
+        start = scanned
+        quotes = 0
+
+    return chunks
+
+
+def _parse_chunk(chunk, con_encabezado, por_columna=False):
+    """
+    Trabajo de cada proceso: lexer, parser y visitor de siempre sobre un bloque
+
+    Regresa las filas del bloque y sus estadisticas; solo el primer bloque trae encabezado.
+    """
+    result = parse_tree(chunk, con_encabezado=con_encabezado, por_columna=por_columna)
+    return [result['header']] + result['rows'], result['estadisticas']
+
+
+def _juntar(parsed, on_row=None):
+    """
+    Junta en orden las filas y las estadisticas de cada bloque conforme llegan
+
+    Con on_row cada fila se entrega ahi y cada bloque se suelta en cuanto se recorre.
+    """
+    all_rows = []
+    header = None
+    estadisticas = None
+    for rows, parciales in parsed:
+        if header is None:
+            header = rows[0]
+        if on_row is None:
+            all_rows.extend(rows)
+        else:
+            for row in rows:
+                on_row(row)
+        estadisticas = parciales if estadisticas is None else estadisticas.combinar(parciales)
+    return {
+        'header': header,
+        'rows': all_rows[1:],
+        'total_fields': estadisticas.campos,
+        'estadisticas': estadisticas
+    }
+
+
+def parse_chunks(input_text, workers=None, chunk_size=CHUNK_SIZE, con_encabezado=True, on_row=None, por_columna=False):
+    """
+    Parsea los bloques en un ProcessPoolExecutor y junta las filas en orden
+
+    El encabezado, total_fields y las estadisticas quedan igual que en una corrida
+    secuencial. on_row recibe las filas (incluido el encabezado) en lugar de result['rows'].
+    """
+    chunks = split_chunks(input_text, chunk_size)
+    if not chunks:
+        # texto vacio: mismo resultado que el parser secuencial
+        return parse_tree(input_text, con_encabezado=con_encabezado, on_row=on_row, por_columna=por_columna)
+
+    encabezados = [con_encabezado] + [False] * (len(chunks) - 1)
+    por_columnas = [por_columna] * len(chunks)
+    if len(chunks) == 1 or workers == 1:
+        return _juntar(map(_parse_chunk, chunks, encabezados, por_columnas), on_row)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        # map conserva el orden de los bloques
+        return _juntar(executor.map(_parse_chunk, chunks, encabezados, por_columnas), on_row)
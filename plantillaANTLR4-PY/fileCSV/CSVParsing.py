@@ -0,0 +1,476 @@
+from antlr4 import *
+from antlr4.error.ErrorStrategy import DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from CSVLexer import CSVLexer
+from CSVParser import CSVParser
+from FileCSVVisitorImpl import FileCSVVisitorImpl
+from FileCSVListenerImpl import FileCSVListenerImpl
+from FastCSVScanner import scan_csv
+from CSVColumns import ColumnarCSV
+from UnbufferedTokenStream import UnbufferedTokenStream
+from CSVMetricas import SIN_METRICAS
+from CSVDiagnostico import DiagnosticoCSV, LexerDiagnostico, EstrategiaDiagnostico, ErroresParser, ListenerDiagnostico
+
+# lineas fisicas que se agrupan antes de pasarlas al lexer en modo streaming
+LINEAS_POR_BLOQUE = 1000
+# caracteres maximos de un bloque que sigue dentro de comillas (un campo multilinea mas largo se corta)
+MAX_CARACTERES_BLOQUE = 1 << 20
+
+
+def build_parser(input_text, listener=None, token_stream=CommonTokenStream, lexer=CSVLexer):
+    """
+    Arma la cadena lexer -> tokens -> parser de antlr4 para un texto
+
+    Con listener el parser no construye arbol: el listener recibe las filas al vuelo.
+    input_text tambien puede ser un CharStream ya armado (por ejemplo MmapCharStream).
+    token_stream es la clase que guarda los tokens entre lexer y parser y lexer
+    la que (o la funcion que) arma el lexer sobre el CharStream.
+    """
+    input_stream = InputStream(input_text) if isinstance(input_text, str) else input_text
+    parser = CSVParser(token_stream(lexer(input_stream)))
+    parser.removeErrorListeners()
+    if listener is not None:
+        parser.buildParseTrees = False
+        parser.addParseListener(listener)
+    return parser
+
+
+# caracteres del token que se muestran en el error (una comilla sin cerrar llega hasta el final)
+LARGO_TOKEN_ERROR = 30
+
+
+class ErrorSintaxisCSV(ValueError):
+    """
+    Primer error de sintaxis del modo estricto: linea (desde 1), columna (desde 1) y token
+    """
+    def __init__(self, linea, columna, token, detalle="token inesperado"):
+        self.linea = linea
+        self.columna = columna
+        if len(token) > LARGO_TOKEN_ERROR:
+            token = token[:LARGO_TOKEN_ERROR] + '...'
+        self.token = token
+        super().__init__(f"linea {linea}, columna {columna}: {detalle} {token!r}")
+
+
+class _EstrategiaEstricta(BailErrorStrategy):
+    """
+    BailErrorStrategy que solo deja pasar la falta del salto de linea final
+
+    CSV.g4 exige ese salto cuando hay varias filas (ver parse_two_stage). Como
+    una fila puede ser vacia, un error en csvFile con EOF enfrente solo puede ser
+    eso: las filas ya estan completas y se termina igual que con la estrategia
+    por omision. Antes de cortar se quitan los listeners del parser, que si no
+    recibirian la salida de las reglas que quedaron a medias.
+    """
+    @staticmethod
+    def _falta_salto_final(recognizer):
+        return recognizer.getCurrentToken().type == Token.EOF and \
+            recognizer._ctx.getRuleIndex() == CSVParser.RULE_csvFile
+
+    def recoverInline(self, recognizer):
+        if self._falta_salto_final(recognizer):
+            return self.getMissingSymbol(recognizer)
+        recognizer.removeParseListeners()
+        return super().recoverInline(recognizer)
+
+    def recover(self, recognizer, e):
+        if self._falta_salto_final(recognizer):
+            return
+        recognizer.removeParseListeners()
+        super().recover(recognizer, e)
+
+
+class _LexerEstricto(CSVLexer):
+    """
+    CSVLexer que convierte el primer error de comillas en ErrorSintaxisCSV
+
+    Una comilla pegada a un TEXT (a media celda) nunca es valida, pero el lexer
+    la tomaria como inicio de un STRING y buscaria la comilla que cierra hasta el
+    final del archivo; aqui se corta antes de leer un solo caracter mas. Lo que
+    el lexer no reconoce (una comilla sin pareja) tambien corta. parser se
+    asigna despues de armarlo, para quitarle los listeners antes de cortar.
+    """
+    def __init__(self, input_stream):
+        super().__init__(input_stream)
+        self.parser = None
+        self._anterior = None
+
+    def nextToken(self):
+        if self._anterior == CSVParser.TEXT and self._input.LA(1) == ord('"'):
+            inicio = self._input.index
+            texto = self._input.getText(inicio, inicio + LARGO_TOKEN_ERROR).splitlines()[0]
+            self._cortar(self._interp.line, self._interp.column, texto, "comilla dentro de un campo sin comillas")
+        token = super().nextToken()
+        self._anterior = token.type
+        return token
+
+    def notifyListeners(self, e):
+        start = self._tokenStartCharIndex
+        texto = self._input.getText(start, self._input.index)
+        self._cortar(self._tokenStartLine, self._tokenStartColumn, texto, "texto no reconocido")
+
+    def _cortar(self, linea, columna, texto, detalle):
+        if self.parser is not None:
+            self.parser.removeParseListeners()
+        raise ErrorSintaxisCSV(linea, columna + 1, texto, detalle)
+
+
+def contar_filas(result):
+    """
+    Filas del resultado contando el encabezado (igual que 'Total de filas')
+    """
+    return len(result['rows']) + (1 if result['header'] else 0)
+
+
+def parse_tree(input_text, metricas=SIN_METRICAS, con_encabezado=True, on_row=None, por_columna=False):
+    """
+    Parsea el texto completo y regresa el resultado del visitor
+
+    Los tokens se leen todos antes de parsear para medir lexer, parser y visitor por separado.
+    con_encabezado=False es para textos que empiezan a mitad del archivo: su primera
+    fila entra en las estadisticas por columna (ver EstadisticasCSV), que solo se
+    acumulan con por_columna. on_row recibe las filas conforme se visitan (ver FileCSVVisitorImpl).
+    """
+    parser = build_parser(input_text)
+    tokens = parser.getTokenStream()
+    with metricas.fase('lexer') as fase:
+        tokens.fill()
+        fase['tokens'] = len(tokens.tokens)
+
+    with metricas.fase('parser'):
+        tree = parser.csvFile()
+
+    # Visita el arbol para extraer datos ( visitor personalizado )
+    with metricas.fase('visitor') as fase:
+        visitor = FileCSVVisitorImpl(con_encabezado, on_row, por_columna)
+        result = visitor.visit(tree)
+        fase['filas'] = visitor.estadisticas.filas
+    return result
+
+
+def parse_listener(input_text, on_row=None, con_encabezado=True, por_columna=False):
+    """
+    Parsea sin construir el arbol; mismo resultado que parse_tree
+
+    CommonTokenStream guarda todos los tokens, asi la memoria sigue creciendo con
+    el archivo (ver CSVMemoria); parse_unbuffered la deja en O(fila).
+    """
+    listener = FileCSVListenerImpl(on_row, con_encabezado, por_columna)
+    parser = build_parser(input_text, listener)
+    parser.csvFile()
+    return listener.data
+
+
+def parse_unbuffered(input_text, on_row=None, con_encabezado=True, por_columna=False):
+    """
+    Igual que parse_listener pero los tokens se descartan en cuanto el parser los usa
+
+    Con on_row (y un MmapCharStream como entrada) la memoria queda constante.
+    """
+    listener = FileCSVListenerImpl(on_row, con_encabezado, por_columna)
+    parser = build_parser(input_text, listener, UnbufferedTokenStream)
+    parser.csvFile()
+    return listener.data
+
+
+def parse_strict(input_text, on_row=None, con_encabezado=True, por_columna=False):
+    """
+    Falla en el primer error de sintaxis con ErrorSintaxisCSV (sin recuperarse)
+
+    BailErrorStrategy corta el parseo en cuanto un token no encaja y el lexer
+    corta en el primer caracter que no reconoce o en una comilla a media celda
+    (ver _LexerEstricto). Los tokens se leen conforme el parser los pide
+    (UnbufferedTokenStream), asi con un MmapCharStream un archivo invalido
+    cuesta lo que se lee hasta el error y no el archivo completo.
+    """
+    listener = FileCSVListenerImpl(on_row, con_encabezado, por_columna)
+    parser = build_parser(input_text, listener, UnbufferedTokenStream, _LexerEstricto)
+    lexer = parser.getTokenStream().tokenSource
+    lexer.parser = parser
+    parser._errHandler = _EstrategiaEstricta()
+    try:
+        parser.csvFile()
+    except ParseCancellationException as cancelado:
+        error = cancelado.args[0] if cancelado.args else None
+        token = getattr(error, 'offendingToken', None) or parser.getCurrentToken()
+        texto = '<EOF>' if token.type == Token.EOF else token.text
+        raise ErrorSintaxisCSV(token.line, token.column + 1, texto) from None
+    return listener.data
+
+
+def parse_diagnostic(input_text, on_row=None, con_encabezado=True, por_columna=False):
+    """
+    Sigue despues de cada error y los regresa todos en result['diagnostico'] (DiagnosticoCSV)
+
+    Anota comillas sin cerrar, comillas sueltas dentro de un campo, tokens
+    inesperados y filas con otro numero de campos que el encabezado. Tanto el
+    lexer como el parser se recuperan saltando al siguiente salto de linea, asi
+    cada error cuesta a lo mucho su linea y las filas siguientes se conservan.
+    """
+    diagnostico = DiagnosticoCSV()
+    listener = ListenerDiagnostico(diagnostico, on_row, con_encabezado, por_columna)
+    parser = build_parser(input_text, listener, UnbufferedTokenStream,
+                          lambda stream: LexerDiagnostico(stream, diagnostico))
+    parser.addErrorListener(ErroresParser(diagnostico))
+    parser._errHandler = EstrategiaDiagnostico()
+    parser.csvFile()
+    tokens = parser.getTokenStream()
+    while tokens.LA(1) != Token.EOF:
+        # un error que llega hasta csvFile termina la regla: se sigue en la linea siguiente
+        tokens.consume()
+        parser.csvFile()
+    listener.data['diagnostico'] = diagnostico
+    return listener.data
+
+
+def parse_two_stage(input_text, con_encabezado=True, on_row=None, por_columna=False):
+    """
+    Parsea primero con prediccion SLL y BailErrorStrategy; si falla repite con LL completo
+
+    result['prediccion'] indica la etapa que logro parsear ('SLL' o 'LL').
+    """
+    parser = build_parser(input_text)
+    parser._interp.predictionMode = PredictionMode.SLL
+    # CSV.g4 exige el salto de linea final cuando hay varias filas; la estrategia
+    # estricta deja pasar solo eso, asi un archivo sin el (texto o mmap) no cae a LL
+    parser._errHandler = _EstrategiaEstricta()
+    try:
+        tree = parser.csvFile()
+        etapa = 'SLL'
+    except ParseCancellationException:
+        # los tokens ya leidos se reutilizan, solo se regresa al inicio del stream
+        parser.reset()
+        parser._interp.predictionMode = PredictionMode.LL
+        parser._errHandler = DefaultErrorStrategy()
+        tree = parser.csvFile()
+        etapa = 'LL'
+
+    visitor = FileCSVVisitorImpl(con_encabezado, on_row, por_columna)
+    result = visitor.visit(tree)
+    result['prediccion'] = etapa
+    return result
+
+
+def parse_fast(input_text, con_encabezado=True, por_columna=False):
+    """
+    Usa el escaner rapido y solo recurre a antlr4 si la entrada no es valida para el
+    """
+    result = scan_csv(input_text, con_encabezado, por_columna=por_columna)
+    if result is None:
+        # antlr4 sigue siendo la referencia para entradas raras o con errores
+        result = parse_tree(input_text, con_encabezado=con_encabezado, por_columna=por_columna)
+    return result
+
+
+def parse_parallel(input_text, workers=None, chunk_size=None, con_encabezado=True, on_row=None,
+                   por_columna=False):
+    """
+    Reparte el texto en bloques y los parsea en varios procesos (ver CSVParallel)
+    """
+    # import local: CSVParallel usa parse_tree de este modulo dentro de cada proceso
+    from CSVParallel import CHUNK_SIZE, parse_chunks
+    return parse_chunks(input_text, workers, chunk_size or CHUNK_SIZE, con_encabezado, on_row, por_columna)
+
+
+# modos de parseo disponibles para analyze_csv
+PARSE_MODES = {
+    'rapido': parse_fast,
+    'arbol': parse_tree,
+    'listener': parse_listener,
+    'sin_buffer': parse_unbuffered,
+    'estricto': parse_strict,
+    'diagnostico': parse_diagnostic,
+    'sll': parse_two_stage,
+    'paralelo': parse_parallel
+}
+
+# modos que aceptan un CharStream (MmapCharStream) en lugar del texto completo
+MODOS_MMAP = ('arbol', 'listener', 'sin_buffer', 'estricto', 'diagnostico', 'sll')
+
+
+def _revisar_entrada(input_text, modo):
+    if not isinstance(input_text, str) and modo not in MODOS_MMAP:
+        raise ValueError(f"El modo '{modo}' necesita el texto completo; con mmap use {', '.join(MODOS_MMAP)}")
+
+
+def parse_csv(input_text, modo='rapido', metricas=SIN_METRICAS, **opciones):
+    """
+    Parsea el texto con el modo indicado (ver PARSE_MODES)
+
+    Solo el modo arbol separa lexer, parser y visitor en metricas; los demas
+    hacen todo en una pasada y se miden como una sola fase 'parseo'. Con
+    por_columna=True en opciones el parser tambien acumula las estadisticas por
+    columna; sin el solo cuenta filas, campos y vacios.
+    """
+    _revisar_entrada(input_text, modo)
+    if modo == 'arbol':
+        return parse_tree(input_text, metricas, **opciones)
+    with metricas.fase('parseo') as fase:
+        result = PARSE_MODES[modo](input_text, **opciones)
+        fase['filas'] = contar_filas(result)
+    return result
+
+
+def parse_columns(input_text, modo='rapido', metricas=SIN_METRICAS, **opciones):
+    """
+    Regresa el CSV como ColumnarCSV (columnas tipadas en lugar de listas de str)
+
+    En todos los modos cada fila va directo a las columnas (on_row) en cuanto el
+    parser la termina, sin armar result['rows']; arbol y sll si arman el arbol.
+    """
+    _revisar_entrada(input_text, modo)
+    table = ColumnarCSV()
+    if modo == 'arbol':
+        data = parse_tree(input_text, metricas, on_row=table.add_row, **opciones)
+    else:
+        with metricas.fase('parseo') as fase:
+            if modo == 'rapido':
+                data = scan_csv(input_text, on_row=table.add_row, **opciones)
+                if data is None:
+                    # igual que parse_fast: antlr4 parsea todo y lo que alcanzo a entregar el escaner se descarta
+                    table = ColumnarCSV()
+                    data = parse_tree(input_text, on_row=table.add_row, **opciones)
+            else:
+                data = PARSE_MODES[modo](input_text, on_row=table.add_row, **opciones)
+            fase['filas'] = table.row_count + (1 if table.header else 0)
+    table.estadisticas = data['estadisticas']
+    table.diagnostico = data.get('diagnostico')
+    table.prediccion = data.get('prediccion')
+    return table
+
+
+def _fin_de_comillas(line, pos):
+    """
+    Posicion despues de la comilla que cierra el STRING abierto antes de pos (-1 si no cierra)
+    """
+    while True:
+        i = line.find('"', pos)
+        if i == -1:
+            return -1
+        # "" es una comilla escrita dentro del campo
+        if not line.startswith('""', i):
+            return i + 1
+        pos = i + 2
+
+
+def _comillas_de_linea(line, inside_quotes):
+    """
+    (inside_quotes, suelta) despues de leer una linea que tiene comillas
+
+    Solo una comilla al inicio de un campo abre un STRING que puede seguir en
+    las lineas siguientes. Una comilla a media celda (suelta) no es valida en
+    CSV.g4 y no cambia el estado, pero el lexer la toma como inicio de un STRING.
+    """
+    pos = 0
+    suelta = False
+    while True:
+        if inside_quotes:
+            pos = _fin_de_comillas(line, pos)
+            if pos == -1:
+                return True, suelta
+            inside_quotes = False
+        elif line.startswith('"', pos):
+            inside_quotes = True
+            pos += 1
+            continue
+        # resto del campo hasta la coma siguiente
+        coma = line.find(',', pos)
+        if '"' in (line[pos:] if coma == -1 else line[pos:coma]):
+            suelta = True
+        if coma == -1:
+            return False, suelta
+        pos = coma + 1
+
+
+def iter_record_chunks(file, lineas_por_bloque=LINEAS_POR_BLOQUE, max_caracteres=MAX_CARACTERES_BLOQUE):
+    """
+    Agrupa las lineas del archivo en bloques que nunca cortan un campo entre comillas
+
+    Un bloque termina despues de una linea con una comilla suelta: el STRING que
+    el lexer empieza ahi no puede pasar a las filas siguientes y el error queda
+    en esa linea. Una comilla que abre un campo y nunca cierra se corta en
+    max_caracteres, asi ningun error deja todo el resto del archivo en un bloque.
+    """
+    buffer = []
+    caracteres = 0
+    inside_quotes = False
+
+    for line in file:
+        buffer.append(line)
+        caracteres += len(line)
+        suelta = False
+        if '"' in line:
+            inside_quotes, suelta = _comillas_de_linea(line, inside_quotes)
+        if inside_quotes:
+            # comilla sin cerrar: antlr pierde lo que queda de este bloque y sigue con el siguiente
+            cortar = caracteres >= max_caracteres
+        else:
+            cortar = len(buffer) >= lineas_por_bloque
+        if cortar or suelta:
+            yield ''.join(buffer)
+            buffer = []
+            caracteres = 0
+            # cada bloque se parsea desde cero, fuera de comillas
+            inside_quotes = False
+
+    if buffer:
+        yield ''.join(buffer)
+
+
+def iter_block_rows(block, primera_linea=1):
+    """
+    Parsea un bloque regla por regla y entrega cada fila en cuanto CSVParser.row termina
+
+    primera_linea es la linea del archivo donde empieza el bloque, para que los
+    errores del lexer y del parser salgan con la linea del archivo y no del bloque.
+    """
+    def lexer(input_stream):
+        # antes de que el parser pida el primer token
+        csv_lexer = CSVLexer(input_stream)
+        csv_lexer.line = primera_linea
+        return csv_lexer
+
+    pending = []
+    parser = build_parser(block, FileCSVListenerImpl(on_row=pending.append), lexer=lexer)
+    tokens = parser.getTokenStream()
+
+    while True:
+        parser.row()
+        yield from pending
+        pending.clear()
+
+        # mismo separador que csvFile: '\r'? '\n'
+        if tokens.LA(1) == CSVParser.T__0:
+            tokens.consume()
+        if tokens.LA(1) == CSVParser.T__1:
+            tokens.consume()
+        elif tokens.LA(1) != Token.EOF:
+            # token inesperado despues de la fila: se descarta hasta el siguiente salto de linea
+            while tokens.LA(1) not in (CSVParser.T__1, Token.EOF):
+                tokens.consume()
+            if tokens.LA(1) == CSVParser.T__1:
+                tokens.consume()
+
+        if tokens.LA(1) == Token.EOF:
+            break
+
+
+def iter_csv_rows(path, lineas_por_bloque=LINEAS_POR_BLOQUE):
+    """
+    Lee el archivo por bloques y entrega las filas una por una (la primera es el encabezado)
+
+    La memoria queda acotada al tamaño de un bloque sin importar el tamaño del archivo.
+    """
+    # newline='' conserva los '\r\n' para que el lexer los vea igual que en el archivo
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        yield from iter_file_rows(file, lineas_por_bloque)
+
+
+def iter_file_rows(file, lineas_por_bloque=LINEAS_POR_BLOQUE):
+    """
+    Igual que iter_csv_rows sobre un archivo ya abierto (por ejemplo stdin) con newline=''
+    """
+    linea = 1
+    for block in iter_record_chunks(file, lineas_por_bloque):
+        yield from iter_block_rows(block, linea)
+        linea += block.count('\n')
@@ -0,0 +1,93 @@
+import cProfile
+import io
+import os
+import pstats
+
+# archivos generados por antlr4 a partir de CSV.g4
+_GENERADOS = ('CSVLexer.py', 'CSVParser.py', 'CSVListener.py', 'CSVVisitor.py')
+_VISITOR = ('FileCSVVisitorImpl.py', 'FileCSVListenerImpl.py')
+_ANALISIS = ('CalifEngine.py', 'CalifFormula.py')
+
+GRUPOS = ('runtime antlr4', 'parser generado', 'visitor', 'analisis', 'otros')
+
+
+def grupo_de(archivo, funcion):
+    """
+    Grupo al que se cargan las funciones de un archivo
+    """
+    nombre = os.path.basename(archivo)
+    if f"{os.sep}antlr4{os.sep}" in archivo or '/antlr4/' in archivo:
+        return 'runtime antlr4'
+    if nombre in _GENERADOS:
+        return 'parser generado'
+    if nombre in _VISITOR:
+        return 'visitor'
+    # <esquema de calificacion> es el codigo que genera CalifFormula
+    if nombre in _ANALISIS or archivo == '<esquema de calificacion>' or (nombre == 'Driver.py' and funcion == 'analisis_calif'):
+        return 'analisis'
+    return 'otros'
+
+
+def tiempo_por_grupo(stats):
+    """
+    Tiempo propio (sin subllamadas) sumado por grupo
+
+    Las funciones nativas (list.append, print, ...) no tienen archivo; su tiempo
+    se carga al grupo de quien las llamo, con el tiempo de cada llamador.
+    """
+    grupos = dict.fromkeys(GRUPOS, 0.0)
+    for (archivo, _, funcion), (_, _, tottime, _, callers) in stats.stats.items():
+        if archivo != '~':
+            grupos[grupo_de(archivo, funcion)] += tottime
+            continue
+        asignado = 0.0
+        for (archivo_caller, _, funcion_caller), (_, _, tiempo, _) in callers.items():
+            if archivo_caller != '~':
+                grupos[grupo_de(archivo_caller, funcion_caller)] += tiempo
+                asignado += tiempo
+        grupos['otros'] += max(tottime - asignado, 0.0)
+    return grupos
+
+
+def tabla_grupos(grupos):
+    """
+    Lineas con los segundos y el porcentaje de cada grupo
+    """
+    total = sum(grupos.values())
+    lineas = [f"{grupo:<16} {segundos:>10.4f} s  {segundos / (total or 1.0):>7.1%}"
+              for grupo, segundos in grupos.items()]
+    lineas.append(f"{'total':<16} {total:>10.4f} s")
+    return lineas
+
+
+def resumen(stats, top=25):
+    """
+    Texto con el tiempo por grupo y las top funciones por tiempo propio y acumulado
+    """
+    salida = io.StringIO()
+    salida.write("...:: PERFIL POR GRUPO ::...\n")
+    salida.write('\n'.join(tabla_grupos(tiempo_por_grupo(stats))) + '\n')
+
+    for orden, titulo in (('tottime', 'TIEMPO PROPIO'), ('cumulative', 'TIEMPO ACUMULADO')):
+        salida.write(f"\n...:: TOP {top} POR {titulo} ::...\n")
+        stats.stream = salida
+        stats.sort_stats(orden).print_stats(top)
+    return salida.getvalue()
+
+
+def perfilar(funcion, args=(), salida='perfil.pstats', top=25):
+    """
+    Corre funcion bajo cProfile, guarda el volcado pstats y el resumen (salida + .txt)
+
+    Regresa (resultado de funcion, tiempo por grupo).
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(funcion, *args)
+
+    profiler.dump_stats(salida)
+    stats = pstats.Stats(profiler)
+    texto = resumen(stats, top)
+    with open(f"{salida}.txt", 'w', encoding='utf-8') as file:
+        file.write(texto)
+
+    return result, tiempo_por_grupo(stats)
@@ -0,0 +1,310 @@
+import math
+import random
+from collections import Counter
+from functools import lru_cache
+from hashlib import blake2b
+from heapq import heappush, heapreplace
+
+# registros de HyperLogLog = 2**PRECISION_HLL (error tipico 1.04 / sqrt(registros) ~ 1.6%)
+PRECISION_HLL = 12
+# tamaño del compactor mas alto de KLL (error de rango ~ 1.7 / K_KLL)
+K_KLL = 200
+# valores que sigue Space-Saving por columna (se reportan los TOP primeros)
+CAPACIDAD_TOP = 64
+TOP = 5
+CUANTILES = (0.25, 0.5, 0.75, 0.95)
+# celdas que se juntan por columna antes de pasarlas a los sketches
+CELDAS_POR_LOTE = 1024
+
+
+@lru_cache(maxsize=1 << 14)
+def hash64(texto):
+    """
+    Hash de 64 bits estable entre corridas (hash() de Python cambia en cada proceso)
+
+    Las columnas de un CSV repiten mucho sus valores, el cache evita recalcularlo.
+    """
+    return int.from_bytes(blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """
+    Conteo aproximado de valores distintos con 2**precision registros de un byte
+    """
+    def __init__(self, precision=PRECISION_HLL):
+        self.precision = precision
+        self.registros = bytearray(1 << precision)
+        self._bits_resto = 64 - precision
+        self._mascara = (1 << self._bits_resto) - 1
+
+    def agregar(self, texto):
+        x = hash64(texto)
+        indice = x >> self._bits_resto
+        # posicion del primer 1 en los bits que no se usaron para el indice
+        rango = self._bits_resto - (x & self._mascara).bit_length() + 1
+        if rango > self.registros[indice]:
+            self.registros[indice] = rango
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimado = alfa * m * m / sum(2.0 ** -r for r in self.registros)
+        vacios = self.registros.count(0)
+        if estimado <= 2.5 * m and vacios:
+            # con pocos valores el conteo lineal de registros vacios es mas preciso
+            estimado = m * math.log(m / vacios)
+        return round(estimado)
+
+
+class CuantilesKLL:
+    """
+    Cuantiles aproximados con el sketch KLL (compactores de capacidad decreciente)
+
+    Cada compactor que se llena se ordena y pasa la mitad de sus valores (los
+    pares o los nones, al azar) al nivel siguiente, donde cada uno pesa el doble.
+    La memoria queda en unos 3 * k valores sin importar cuantos se agreguen.
+    """
+    def __init__(self, k=K_KLL, semilla=0):
+        self.k = k
+        self.compactores = [[]]
+        self.tam = 0
+        # semilla fija: el mismo archivo da siempre el mismo reporte
+        self._azar = random.Random(semilla)
+        self._max_tam = self._capacidad(0)
+
+    def _capacidad(self, nivel):
+        altura = len(self.compactores)
+        return int(math.ceil(self.k * (2 / 3) ** (altura - nivel - 1))) + 1
+
+    def agregar(self, valor):
+        self.agregar_lote((valor,))
+
+    def agregar_lote(self, valores):
+        nivel0 = self.compactores[0]
+        antes = len(nivel0)
+        nivel0.extend(valores)
+        self.tam += len(nivel0) - antes
+        while self.tam >= self._max_tam:
+            self._comprimir()
+
+    def _comprimir(self):
+        for nivel, compactor in enumerate(self.compactores):
+            if len(compactor) < self._capacidad(nivel):
+                continue
+            if nivel + 1 == len(self.compactores):
+                self.compactores.append([])
+            compactor.sort()
+            # con un numero impar se queda el ultimo para no perder su peso
+            sobrante = compactor.pop() if len(compactor) % 2 else None
+            elegidos = compactor[self._azar.getrandbits(1)::2]
+            self.compactores[nivel + 1].extend(elegidos)
+            self.tam -= len(compactor) - len(elegidos)
+            compactor.clear()
+            if sobrante is not None:
+                compactor.append(sobrante)
+            break
+        self._max_tam = sum(self._capacidad(nivel) for nivel in range(len(self.compactores)))
+
+    def cuantiles(self, fracciones):
+        """
+        Valor aproximado de cada fraccion (0-1); None si no se agrego nada
+        """
+        pesados = sorted((valor, 1 << nivel) for nivel, compactor in enumerate(self.compactores)
+                         for valor in compactor)
+        if not pesados:
+            return [None] * len(fracciones)
+        total = sum(peso for _, peso in pesados)
+        resultado = []
+        for fraccion in fracciones:
+            objetivo = fraccion * total
+            acumulado = 0
+            for valor, peso in pesados:
+                acumulado += peso
+                if acumulado >= objetivo:
+                    break
+            resultado.append(valor)
+        return resultado
+
+
+class TopFrecuentes:
+    """
+    Valores mas frecuentes con Space-Saving: a lo mucho `capacidad` contadores
+
+    Un valor nuevo con los contadores llenos reemplaza al de menor cuenta y
+    hereda esa cuenta como error maximo. Las cuentas de un heap se corrigen solo
+    al buscar el minimo, asi cada valor cuesta O(1) salvo los reemplazos. Con
+    peso un valor cuenta varias veces de una vez (lotes ya contados).
+    """
+    def __init__(self, capacidad=CAPACIDAD_TOP):
+        self.capacidad = capacidad
+        self.conteos = {}
+        self.errores = {}
+        # una entrada (cuenta, valor) por contador; la cuenta puede ir atrasada
+        self._heap = []
+
+    def agregar(self, valor, peso=1):
+        conteos = self.conteos
+        if valor in conteos:
+            conteos[valor] += peso
+            return
+        if len(conteos) < self.capacidad:
+            conteos[valor] = peso
+            self.errores[valor] = 0
+            heappush(self._heap, (peso, valor))
+            return
+
+        while True:
+            cuenta, candidato = self._heap[0]
+            actual = conteos[candidato]
+            if actual == cuenta:
+                break
+            heapreplace(self._heap, (actual, candidato))
+        del conteos[candidato]
+        del self.errores[candidato]
+        conteos[valor] = cuenta + peso
+        self.errores[valor] = cuenta
+        heapreplace(self._heap, (cuenta + peso, valor))
+
+    def top(self, n=TOP):
+        """
+        [(valor, cuenta, error maximo)] de mayor a menor cuenta
+
+        Solo entran los que seguro se repiten (cuenta - error > 1); en una columna
+        casi unica los contadores solo guardan los ultimos valores vistos.
+        """
+        seguros = [(valor, cuenta) for valor, cuenta in self.conteos.items() if cuenta - self.errores[valor] > 1]
+        orden = sorted(seguros, key=lambda par: (-par[1], par[0]))[:n]
+        return [(valor, cuenta, self.errores[valor]) for valor, cuenta in orden]
+
+
+class PerfilColumna:
+    """
+    Nulos, distintos, cuantiles y valores frecuentes de una columna con memoria fija
+
+    Las celdas no vacias se juntan en lotes de CELDAS_POR_LOTE: cada lote se
+    cuenta con Counter, asi HyperLogLog y Space-Saving ven cada valor distinto
+    una vez con su peso, y los numeros se convierten con map(float).
+    """
+    def __init__(self):
+        self.celdas = 0
+        self.nulos = 0
+        self.numericos = 0
+        self.minimo = None
+        self.maximo = None
+        self.distintos = HyperLogLog()
+        self.cuantiles = CuantilesKLL()
+        self.frecuentes = TopFrecuentes()
+        self.pendientes = []
+
+    def agregar(self, texto):
+        self.celdas += 1
+        if texto == "":
+            self.nulos += 1
+            return
+        self.pendientes.append(texto)
+        if len(self.pendientes) >= CELDAS_POR_LOTE:
+            self._vaciar()
+
+    def _vaciar(self):
+        lote = self.pendientes
+        if not lote:
+            return
+        self.pendientes = []
+        conteo = Counter(lote)
+        for texto, veces in conteo.items():
+            self.distintos.agregar(texto)
+            self.frecuentes.agregar(texto, veces)
+
+        try:
+            valores = list(map(float, lote))
+        except ValueError:
+            # columna con texto: solo se convierten los valores distintos
+            valores = []
+            for texto, veces in conteo.items():
+                try:
+                    valor = float(texto)
+                except ValueError:
+                    continue
+                valores.extend([valor] * veces)
+        valores = list(filter(math.isfinite, valores))
+        if valores:
+            self.numericos += len(valores)
+            minimo, maximo = min(valores), max(valores)
+            self.minimo = minimo if self.minimo is None else min(self.minimo, minimo)
+            self.maximo = maximo if self.maximo is None else max(self.maximo, maximo)
+            self.cuantiles.agregar_lote(valores)
+
+    def lineas(self, top=TOP):
+        self._vaciar()
+        tasa = self.nulos / self.celdas if self.celdas else 0.0
+        lineas = [
+            f"  nulos: {tasa:.1%} ({self.nulos} de {self.celdas})",
+            f"  distintos (aprox.): {self.distintos.estimar() if self.celdas > self.nulos else 0}"
+        ]
+        if self.numericos:
+            valores = self.cuantiles.cuantiles(CUANTILES)
+            partes = [f"min {self.minimo:g}"]
+            partes += [f"p{round(fraccion * 100)} {valor:g}" for fraccion, valor in zip(CUANTILES, valores)]
+            partes.append(f"max {self.maximo:g}")
+            lineas.append(f"  cuantiles (aprox., {self.numericos} numericos): {', '.join(partes)}")
+        frecuentes = self.frecuentes.top(top)
+        if frecuentes:
+            # con error > 0 la cuenta puede estar inflada hasta en esa cantidad
+            lineas.append(f"  top {top}: " + ", ".join(
+                f"{valor!r} x{cuenta}" + (f" (+-{error})" if error else "") for valor, cuenta, error in frecuentes))
+        elif self.celdas > self.nulos:
+            lineas.append(f"  top {top}: ningun valor se repite con seguridad")
+        return lineas
+
+
+class PerfilColumnas:
+    """
+    Perfil de todas las columnas en una sola pasada; la primera fila es el encabezado
+
+    Se alimenta fila por fila (por ejemplo desde iter_csv_rows) sin guardar las
+    filas, asi la memoria depende del numero de columnas y no del de filas. Las
+    celdas que le faltan a una fila corta cuentan como nulos.
+    """
+    def __init__(self, top=TOP):
+        self.top = top
+        self.encabezado = None
+        self.filas = 0
+        self.columnas = []
+
+    def agregar_fila(self, fields):
+        if self.encabezado is None:
+            self.encabezado = fields
+            self.columnas = [PerfilColumna() for _ in fields]
+            return
+        self.filas += 1
+        columnas = self.columnas
+        while len(columnas) < len(fields):
+            columna = PerfilColumna()
+            # la columna nueva no estuvo en las filas anteriores
+            columna.celdas = columna.nulos = self.filas - 1
+            columnas.append(columna)
+        # mismo trabajo que PerfilColumna.agregar, sin una llamada por celda
+        for columna, texto in zip(columnas, fields):
+            columna.celdas += 1
+            if texto == "":
+                columna.nulos += 1
+                continue
+            pendientes = columna.pendientes
+            pendientes.append(texto)
+            if len(pendientes) >= CELDAS_POR_LOTE:
+                columna._vaciar()
+        for columna in columnas[len(fields):]:
+            columna.celdas += 1
+            columna.nulos += 1
+
+    def nombre(self, indice):
+        if self.encabezado and indice < len(self.encabezado) and self.encabezado[indice]:
+            return f"Columna {indice + 1} ({self.encabezado[indice]})"
+        return f"Columna {indice + 1}"
+
+    def lineas(self):
+        lineas = []
+        for indice, columna in enumerate(self.columnas):
+            lineas.append(self.nombre(indice))
+            lineas.extend(columna.lineas(self.top))
+        return lineas
@@ -0,0 +1,107 @@
+import sys
+from collections import deque
+
+from CSVEstadisticas import EstadisticaColumna
+
+NIVELES = ('silencioso', 'resumen', 'completo')
+# filas que se muestran al inicio y al final en el nivel resumen
+MUESTRA = 5
+# lineas que se juntan antes de cada write a la salida
+LINEAS_POR_BLOQUE = 1000
+
+
+class Reporte:
+    """
+    Texto que imprime el analizador segun el nivel de detalle
+
+    silencioso: solo errores, advertencias y lo que se pregunta al usuario.
+    resumen: totales, estadisticas y las primeras y ultimas `muestra` filas.
+    completo: todo, fila por fila (la salida de siempre).
+    Las filas se juntan y se escriben por bloques en lugar de un print por fila.
+    """
+    def __init__(self, nivel='completo', muestra=MUESTRA, stream=None):
+        if nivel not in NIVELES:
+            raise ValueError(f"Nivel de reporte invalido: '{nivel}' (use {', '.join(NIVELES)})")
+        self.nivel = nivel
+        self.muestra = muestra
+        self.stream = stream
+
+    def _salida(self):
+        # se resuelve en cada uso para respetar redirect_stdout
+        return self.stream or sys.stdout
+
+    def _escribir(self, lineas):
+        if lineas:
+            self._salida().write('\n'.join(lineas) + '\n')
+            lineas.clear()
+
+    def info(self, texto=""):
+        """
+        Linea informativa (totales, encabezados, titulos); no sale en silencioso
+        """
+        if self.nivel != 'silencioso':
+            print(texto, file=self._salida())
+
+    def estadistica(self, texto):
+        """
+        Linea que solo sale en resumen (en completo ya se ven todas las filas)
+        """
+        if self.nivel == 'resumen':
+            print(texto, file=self._salida())
+
+    def filas(self, rows, formato, inicio=1):
+        """
+        Consume rows (lista o generador) y las imprime segun el nivel; regresa cuantas hubo
+
+        formato(i, row) arma la linea de cada fila; en resumen solo se arman las
+        que se muestran.
+        """
+        total = 0
+        if self.nivel == 'silencioso':
+            for _ in rows:
+                total += 1
+            return total
+
+        bloque = []
+        ultimas = deque(maxlen=self.muestra) if self.nivel == 'resumen' else None
+        for i, row in enumerate(rows, inicio):
+            total += 1
+            if ultimas is not None and total > self.muestra:
+                ultimas.append((i, row))
+                continue
+            bloque.append(formato(i, row))
+            if len(bloque) >= LINEAS_POR_BLOQUE:
+                self._escribir(bloque)
+
+        if ultimas is not None:
+            omitidas = total - self.muestra - len(ultimas)
+            if omitidas > 0:
+                bloque.append(f"... ({omitidas} filas omitidas) ...")
+            bloque.extend(formato(i, row) for i, row in ultimas)
+        self._escribir(bloque)
+        return total
+
+
+class ResumenColumnas:
+    """
+    Estadisticas (EstadisticaColumna) de algunas columnas conforme pasan las filas
+
+    Se usa para las columnas calculadas (CAL, RED), que no pasan por el parser.
+    """
+    def __init__(self, columnas):
+        # columnas: {nombre: indice}
+        self.columnas = columnas
+        self.valores = {nombre: EstadisticaColumna() for nombre in columnas}
+
+    def pasar(self, rows):
+        """
+        Regresa las mismas filas acumulando los valores de las columnas
+        """
+        for row in rows:
+            for nombre, indice in self.columnas.items():
+                if indice < len(row):
+                    self.valores[nombre].agregar(row[indice])
+            yield row
+
+    def lineas(self):
+        return [f"{nombre}: {columna.describir()}" for nombre, columna in self.valores.items()]
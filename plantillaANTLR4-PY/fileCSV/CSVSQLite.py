@@ -0,0 +1,186 @@
+import math
+import os
+import sqlite3
+
+from CSVSalida import NOMBRE_DEFAULT
+
+# filas que se mandan en cada executemany; las del primer lote tambien fijan los tipos
+FILAS_POR_LOTE = 10000
+
+
+def _identificador(nombre):
+    return '"' + nombre.replace('"', '""') + '"'
+
+
+def nombres_columnas(header):
+    """
+    Nombres de columna validos y sin repetir: '' pasa a columna_N y los repetidos llevan _2, _3, ...
+    """
+    nombres = []
+    usados = set()
+    for i, nombre in enumerate(header):
+        base = nombre.strip() or f"columna_{i + 1}"
+        nombre, n = base, 1
+        # SQLite no distingue mayusculas en los nombres de columna
+        while nombre.lower() in usados:
+            n += 1
+            nombre = f"{base}_{n}"
+        usados.add(nombre.lower())
+        nombres.append(nombre)
+    return nombres
+
+
+def inferir_tipo(celdas):
+    """
+    INTEGER, REAL o TEXT segun las celdas no vacias de una columna (TEXT si todas estan vacias)
+    """
+    textos = [celda for celda in celdas if celda != ""]
+    if not textos:
+        return 'TEXT'
+    try:
+        list(map(int, textos))
+        return 'INTEGER'
+    except ValueError:
+        pass
+    try:
+        valores = list(map(float, textos))
+    except ValueError:
+        return 'TEXT'
+    # 'nan' o 'inf' escritos en el CSV se toman como texto (igual que en ColumnarCSV)
+    return 'REAL' if all(map(math.isfinite, valores)) else 'TEXT'
+
+
+def tabla_de(entrada=None):
+    """
+    Nombre de tabla por omision: el del archivo de entrada sin extension
+    """
+    if entrada:
+        return os.path.splitext(os.path.basename(entrada))[0]
+    return NOMBRE_DEFAULT
+
+
+class CargaSQLite:
+    """
+    Carga filas en una tabla nueva de SQLite conforme llegan, todo en una transaccion
+
+    Tiene la misma forma que EscritorCSV (write_row, close, with), asi sirve con
+    escribir_al_pasar. Las filas se juntan en lotes de FILAS_POR_LOTE que se
+    insertan con executemany; el primer lote decide el tipo de cada columna.
+    Los valores van como texto y SQLite los convierte por la afinidad de la
+    columna, sin un float() por celda en Python; las celdas vacias quedan NULL.
+    Los indices se crean al final, despues de insertar (mas rapido que
+    mantenerlos fila por fila). Si algo falla la transaccion se deshace.
+    """
+    def __init__(self, path, tabla, header, indices=()):
+        self.path = path
+        self.tabla = tabla
+        self.columnas = nombres_columnas(header)
+        self.indices = list(dict.fromkeys(indices))
+        self.filas = 0
+        # {columna: tipo} una vez creada la tabla
+        self.tipos = {}
+        self._pendientes = []
+        self._insert = None
+        # sin transacciones implicitas: se abre una sola para toda la carga
+        self._conexion = sqlite3.connect(path, isolation_level=None)
+        self._conexion.execute("BEGIN")
+
+    def write_row(self, row):
+        ancho = len(self.columnas)
+        if len(row) != ancho:
+            # filas cortas se rellenan y las largas se cortan al ancho del encabezado
+            row = (list(row) + [""] * ancho)[:ancho]
+        self._pendientes.append(row)
+        self.filas += 1
+        if len(self._pendientes) >= FILAS_POR_LOTE:
+            self.flush()
+
+    def _crear_tabla(self):
+        tipos = [inferir_tipo([row[i] for row in self._pendientes]) for i in range(len(self.columnas))]
+        tabla = _identificador(self.tabla)
+        definicion = ', '.join(f"{_identificador(nombre)} {tipo}" for nombre, tipo in zip(self.columnas, tipos))
+        self._conexion.execute(f"DROP TABLE IF EXISTS {tabla}")
+        self._conexion.execute(f"CREATE TABLE {tabla} ({definicion})")
+        valores = ', '.join(["NULLIF(?, '')"] * len(self.columnas))
+        self._insert = f"INSERT INTO {tabla} VALUES ({valores})"
+        self.tipos = dict(zip(self.columnas, tipos))
+
+    def flush(self):
+        if self._insert is None:
+            self._crear_tabla()
+        if self._pendientes:
+            self._conexion.executemany(self._insert, self._pendientes)
+            self._pendientes.clear()
+
+    def close(self):
+        if self._conexion is None:
+            return
+        try:
+            self.flush()
+            tabla = _identificador(self.tabla)
+            for indice in self.indices:
+                nombre = self.columnas[indice]
+                self._conexion.execute(f"CREATE INDEX {_identificador(f'idx_{self.tabla}_{nombre}')} "
+                                       f"ON {tabla} ({_identificador(nombre)})")
+            # estadisticas para que el planificador de consultas elija los indices
+            self._conexion.execute(f"ANALYZE {tabla}")
+            self._conexion.execute("COMMIT")
+        except BaseException:
+            self._conexion.execute("ROLLBACK")
+            raise
+        finally:
+            self._conexion.close()
+            self._conexion = None
+
+    def lineas(self):
+        indices = ', '.join(self.columnas[i] for i in self.indices)
+        return [f"Tabla '{self.tabla}' cargada en {self.path}: {self.filas} filas",
+                f"Tipos: {', '.join(f'{nombre} {tipo}' for nombre, tipo in self.tipos.items())}",
+                f"Indices: {indices}"]
+
+    def cancelar(self):
+        if self._conexion is not None:
+            self._conexion.execute("ROLLBACK")
+            self._conexion.close()
+            self._conexion = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *exc):
+        if tipo is None:
+            self.close()
+        else:
+            self.cancelar()
+
+
+class ExportacionSQLite:
+    """
+    Configuracion de --sqlite: base de datos, tabla y columnas con indice
+
+    Siempre lleva indice la columna clave (la primera, o la que se indique por
+    nombre) y cada columna calificada; `indices` agrega otras por nombre (sin
+    importar mayusculas), por ejemplo la del grupo.
+    """
+    def __init__(self, path, tabla=None, clave=None, indices=()):
+        self.path = path
+        self.tabla = tabla or NOMBRE_DEFAULT
+        self.clave = clave
+        self.indices = indices
+
+    def _indices(self, header, calificadas):
+        nombres = [h.strip().upper() for h in header]
+        buscados = ([self.clave] if self.clave else []) + list(self.indices)
+        indices = [] if self.clave or not header else [0]
+        for buscado in buscados:
+            encontrados = [i for i, nombre in enumerate(nombres) if nombre == buscado.strip().upper()]
+            if not encontrados:
+                raise ValueError(f"--sqlite: no hay columna '{buscado}' en el encabezado")
+            indices.extend(encontrados)
+        return indices + list(calificadas)
+
+    def abrir(self, header, calificadas=()):
+        """
+        CargaSQLite para este encabezado; calificadas son los indices de las columnas calculadas
+        """
+        return CargaSQLite(self.path, self.tabla, header, self._indices(header, calificadas))
@@ -0,0 +1,70 @@
+import os
+import csv
+
+# lineas que se juntan antes de cada write al archivo
+FILAS_POR_ESCRITURA = 1000
+# buffer del archivo de salida (bytes)
+BUFFER_SALIDA = 1 << 16
+
+# nombre del archivo cuando no hay entrada de donde tomarlo (igual que al preguntar)
+NOMBRE_DEFAULT = "resultado"
+
+
+class EscritorCSV:
+    """
+    Escribe el CSV conforme llegan las filas, sin esperar a tenerlas todas
+
+    Las filas se juntan en bloques de FILAS_POR_ESCRITURA y se mandan con un
+    solo writerows a un archivo con buffer de BUFFER_SALIDA. Se escribe con
+    csv.writer (igual que el filtro de stdin): campos con coma, comillas o saltos
+    de linea salen entre comillas y el archivo se puede volver a leer.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.filas = 0
+        self._pendientes = []
+        self._file = open(path, 'w', encoding='utf-8', newline='', buffering=BUFFER_SALIDA)
+        self._writer = csv.writer(self._file, lineterminator='\n')
+
+    def write_row(self, row):
+        self._pendientes.append(row)
+        self.filas += 1
+        if len(self._pendientes) >= FILAS_POR_ESCRITURA:
+            self.flush()
+
+    def flush(self):
+        self._writer.writerows(self._pendientes)
+        self._pendientes.clear()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def ruta_salida(salida, entrada=None):
+    """
+    Archivo destino para --salida: la ruta tal cual o, si es carpeta, <entrada>_resultado.csv dentro
+    """
+    if not (os.path.isdir(salida) or salida.endswith(('/', os.sep))):
+        return salida
+    os.makedirs(salida, exist_ok=True)
+    nombre = NOMBRE_DEFAULT
+    if entrada:
+        nombre = f"{os.path.splitext(os.path.basename(entrada))[0]}_{NOMBRE_DEFAULT}"
+    return os.path.join(salida, f"{nombre}.csv")
+
+
+def escribir_al_pasar(escritor, rows):
+    """
+    Escribe cada fila y la vuelve a entregar (para imprimirla o contarla despues)
+    """
+    for row in rows:
+        escritor.write_row(row)
+        yield row
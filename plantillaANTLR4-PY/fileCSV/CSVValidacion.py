@@ -0,0 +1,230 @@
+import re
+from collections import Counter
+from itertools import islice
+
+from CSVColumns import NAN
+
+# reglas de siempre: de la tercera columna en adelante los numeros van de 0 a 10
+REGLAS_DEFAULT = """
+# columna = minimo..maximo   (columna: nombre del encabezado, numero desde 1 o N- para N y las siguientes)
+3- = 0..10
+"""
+
+# advertencias que se listan una por una; las demas solo se cuentan
+LIMITE_ADVERTENCIAS = 20
+# filas que se validan juntas (cada columna del bloque se convierte de una vez)
+FILAS_POR_BLOQUE = 10000
+
+_NUMERO = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_LINEA = re.compile(rf'^\s*([^=\s]+)\s*=\s*({_NUMERO})\s*\.\.\s*({_NUMERO})\s*$')
+_DESDE = re.compile(r'^(\d+)-$')
+
+
+class ReglasValidacion:
+    """
+    Rango permitido por columna, declarado como texto (una regla por linea)
+
+        3- = 0..10
+        EXA = 0..100
+
+    La columna se indica por nombre (todas las que lo tengan, sin importar
+    mayusculas), por numero desde 1 o con N- para esa y todas las siguientes.
+    Si varias reglas tocan la misma columna gana la ultima. Las celdas vacias o
+    que no son numero no se validan.
+    """
+    def __init__(self, texto=REGLAS_DEFAULT):
+        self.reglas = []
+        for numero, linea in enumerate(texto.splitlines(), 1):
+            linea = linea.strip()
+            if not linea or linea.startswith('#'):
+                continue
+            match = _LINEA.match(linea)
+            if not match:
+                raise ValueError(f"Linea {numero} de las reglas invalida: '{linea}'")
+            columna, minimo, maximo = match.groups()
+            minimo, maximo = float(minimo), float(maximo)
+            if minimo > maximo:
+                raise ValueError(f"Linea {numero} de las reglas: el minimo es mayor que el maximo")
+            self.reglas.append((columna, minimo, maximo))
+
+    @classmethod
+    def desde_archivo(cls, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls(file.read())
+
+    def compilar(self, header, ancho=0):
+        """
+        {indice: (minimo, maximo)} para un encabezado; ancho cubre filas mas largas que el
+        """
+        ancho = max(len(header), ancho)
+        nombres = [h.upper() for h in header]
+        rangos = {}
+        for columna, minimo, maximo in self.reglas:
+            desde = _DESDE.match(columna)
+            if desde:
+                indices = range(int(desde.group(1)) - 1, ancho)
+            elif columna.isdigit():
+                indices = [int(columna) - 1]
+            else:
+                indices = [i for i, nombre in enumerate(nombres) if nombre == columna.upper()]
+            for indice in indices:
+                rangos[indice] = (minimo, maximo)
+        return rangos
+
+
+class ReporteValidacion:
+    """
+    Resultado de validar: total de advertencias, cuenta por columna y las primeras `limite`
+
+    Cada advertencia es (fila, columna, valor, regla) con la fila como en
+    'Fila N' (el encabezado es la fila 1) y la columna desde 1.
+    """
+    def __init__(self, limite=LIMITE_ADVERTENCIAS):
+        self.limite = limite
+        self.total = 0
+        self.por_columna = Counter()
+        self.advertencias = []
+
+    def agregar_bloque(self, encontradas):
+        """
+        Suma las advertencias de un bloque: {columna: [(fila, valor, regla), ...]}
+        """
+        nuevas = []
+        for columna, lista in encontradas.items():
+            self.total += len(lista)
+            self.por_columna[columna] += len(lista)
+            # de cada columna bastan las primeras; los bloques llegan en orden de fila
+            nuevas.extend((fila, columna, valor, regla) for fila, valor, regla in lista[:self.limite])
+        if nuevas and len(self.advertencias) < self.limite:
+            self.advertencias = sorted(self.advertencias + nuevas)[:self.limite]
+
+    def como_dict(self):
+        return {
+            'total': self.total,
+            'por_columna': dict(sorted(self.por_columna.items())),
+            'advertencias': [{'fila': fila, 'columna': columna, 'valor': valor, 'regla': regla}
+                             for fila, columna, valor, regla in self.advertencias]
+        }
+
+    def lineas(self):
+        lineas = [f"Advertencia: Calificación inválida '{valor}' en fila {fila}, columna {columna} (regla {regla})"
+                  for fila, columna, valor, regla in self.advertencias]
+        if self.total > len(self.advertencias):
+            lineas.append(f"... {self.total - len(self.advertencias)} advertencias mas sin mostrar")
+        if self.total:
+            conteo = ', '.join(f"columna {columna}: {veces}" for columna, veces in sorted(self.por_columna.items()))
+            lineas.append(f"Advertencias de validacion: {self.total} ({conteo})")
+        return lineas
+
+
+def _fuera_de_rango(celdas, minimo, maximo):
+    """
+    Posiciones de las celdas (str) con un numero fuera de [minimo, maximo]
+    """
+    posiciones = [i for i, celda in enumerate(celdas) if celda]
+    textos = [celdas[i] for i in posiciones]
+    try:
+        valores = list(map(float, textos))
+    except ValueError:
+        # hay texto en la columna: se convierte celda por celda; el texto no se
+        # valida, queda como NaN igual que las celdas vacias de ColumnarCSV
+        valores = []
+        for texto in textos:
+            try:
+                valores.append(float(texto))
+            except ValueError:
+                valores.append(NAN)
+    # NaN no pasa ninguna comparacion, asi 'nan' escrito en el CSV no se reporta
+    return [posiciones[j] for j, valor in enumerate(valores) if valor < minimo or valor > maximo]
+
+
+class Validador:
+    """
+    Valida filas por bloques contra los rangos compilados para un encabezado
+
+    Cada columna con regla se extrae del bloque y se convierte de una sola vez,
+    fuera del parser; el resultado se acumula en self.reporte.
+    """
+    def __init__(self, reglas, header, limite=LIMITE_ADVERTENCIAS, ancho=0):
+        self.rangos = reglas.compilar(header, ancho)
+        self.reporte = ReporteValidacion(limite)
+
+    def validar_filas(self, rows, primera_fila=2):
+        """
+        Valida un bloque de filas; primera_fila es el numero de la primera (2 = despues del encabezado)
+        """
+        encontradas = {}
+        for indice, (minimo, maximo) in self.rangos.items():
+            celdas = [row[indice] if indice < len(row) else "" for row in rows]
+            fuera = _fuera_de_rango(celdas, minimo, maximo)
+            if fuera:
+                regla = f"{minimo:g}..{maximo:g}"
+                encontradas[indice + 1] = [(primera_fila + i, celdas[i], regla) for i in fuera]
+        self.reporte.agregar_bloque(encontradas)
+
+    def validar_columnas(self, table):
+        """
+        Igual que validar_filas sobre un ColumnarCSV: las columnas numericas ya son array('d')
+        """
+        encontradas = {}
+        for indice, (minimo, maximo) in self.rangos.items():
+            column = table.column(indice)
+            if column is None:
+                continue
+            if column.numeric:
+                # NaN (vacia o faltante) no pasa ninguna comparacion
+                fuera = [i for i, valor in enumerate(column.values) if valor < minimo or valor > maximo]
+            else:
+                celdas = [column.text(i) for i in range(table.row_count)]
+                fuera = _fuera_de_rango(celdas, minimo, maximo)
+            if fuera:
+                regla = f"{minimo:g}..{maximo:g}"
+                encontradas[indice + 1] = [(i + 2, column.text(i), regla) for i in fuera]
+        self.reporte.agregar_bloque(encontradas)
+
+    def validar_iter(self, rows, filas_por_bloque=FILAS_POR_BLOQUE, primera_fila=2):
+        """
+        Entrega las mismas filas validandolas por bloques (modo streaming)
+        """
+        rows = iter(rows)
+        while True:
+            bloque = list(islice(rows, filas_por_bloque))
+            if not bloque:
+                return
+            self.validar_filas(bloque, primera_fila)
+            primera_fila += len(bloque)
+            yield from bloque
+
+
+class Validacion:
+    """
+    Configuracion de la validacion: reglas y limite de advertencias que se listan
+
+    Donde se recibe una Validacion, None la apaga (entradas de confianza).
+    """
+    def __init__(self, reglas=None, limite=LIMITE_ADVERTENCIAS):
+        self.reglas = reglas or ReglasValidacion()
+        self.limite = limite
+
+    def validador(self, header, ancho=0):
+        return Validador(self.reglas, header, self.limite, ancho)
+
+    def validar(self, result):
+        """
+        Valida un resultado completo (filas o columnas) y regresa su ReporteValidacion
+        """
+        if not result['header']:
+            return ReporteValidacion(self.limite)
+        estadisticas = result.get('estadisticas')
+        ancho = estadisticas.ancho if estadisticas is not None else 0
+        validador = self.validador(result['header'], ancho)
+        if 'columnas' in result:
+            validador.validar_columnas(result['columnas'])
+        else:
+            rows = result['rows']
+            for inicio in range(0, len(rows), FILAS_POR_BLOQUE):
+                validador.validar_filas(rows[inicio:inicio + FILAS_POR_BLOQUE], inicio + 2)
+        return validador.reporte
+
+
+VALIDACION_DEFAULT = Validacion()
@@ -0,0 +1,117 @@
+from array import array
+
+from CSVColumns import NAN
+
+# numpy es opcional: sin el se usa el calculo en python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def redondear_calif(cal, minimo=7):
+    """
+    Reglas de redondeo: menos del minimo es 0, desde ahi se redondea .5 hacia arriba
+    """
+    if cal < minimo:
+        return 0.0
+    fractional_part = cal - int(cal)
+    if fractional_part >= 0.5:
+        return float(int(cal) + 1)
+    return float(int(cal))
+
+
+def redondear_calif_np(cal, minimo=7):
+    """
+    redondear_calif sobre un array completo de numpy
+    """
+    entero = np.trunc(cal)
+    red = np.where(cal - entero >= 0.5, entero + 1, entero)
+    return np.where(cal < minimo, 0.0, red)
+
+
+def floats_columna(table, index, omitir_invalidos=False):
+    """
+    Valores de una columna de ColumnarCSV como array('d'); NaN marca celdas vacias
+    """
+    column = table.column(index)
+    if column is None:
+        return array('d', [NAN]) * table.row_count
+    if column.numeric:
+        return column.values
+
+    # columna de texto: mismas reglas que float() sobre cada celda
+    values = array('d')
+    for text in column.values:
+        if not text:
+            values.append(NAN)
+            continue
+        try:
+            values.append(float(text))
+        except ValueError:
+            if not omitir_invalidos:
+                raise
+            values.append(NAN)
+    return values
+
+
+def _prom_python(columns, i):
+    total = 0.0
+    count = 0
+    for column in columns:
+        value = column[i]
+        if value == value:
+            total += value
+            count += 1
+    return total / count if count else 0
+
+
+def _prom_numpy(columns):
+    # frombuffer no copia: lee directo la memoria de cada array('d')
+    values = np.array([np.frombuffer(column, dtype=np.float64) for column in columns])
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    # suma fila por fila en el mismo orden que el calculo en python
+    total = np.where(valid, values, 0.0).sum(axis=0)
+    return np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+
+
+def calcular_columnas(table, evaluador, usar_numpy=True):
+    """
+    Evalua el esquema compilado sobre todas las filas de una vez
+
+    Con numpy instalado cada formula se calcula una sola vez sobre columnas
+    completas; si no, se evalua fila por fila en python puro con las mismas
+    reglas (vacios cuentan 0, vacios de prom() no promedian). Regresa
+    {indice: (array('d'), formato)} para las columnas de salida del encabezado.
+    """
+    n = table.row_count
+    columns = [floats_columna(table, idx) for idx in evaluador.columnas.values()]
+    groups = [[floats_columna(table, idx, omitir_invalidos=True) for idx in indices]
+              for indices in evaluador.grupos.values()]
+
+    if usar_numpy and evaluador.calcular_np is not None and n:
+        args = [np.nan_to_num(np.frombuffer(column, dtype=np.float64), nan=0.0) for column in columns]
+        args += [_prom_numpy(group) for group in groups]
+        # numpy solo avisaria y dejaria inf/nan; se corta con el mismo error que fila por fila
+        try:
+            with np.errstate(divide='raise', invalid='raise'):
+                valores = evaluador.calcular_np(*args)
+        except FloatingPointError:
+            raise ZeroDivisionError("float division by zero") from None
+        results = [array('d', np.broadcast_to(np.asarray(values, dtype=np.float64), (n,)).tobytes())
+                   for values in valores]
+    else:
+        calcular = evaluador.calcular
+        results = [array('d') for _ in evaluador.salidas]
+        for i in range(n):
+            # NaN (celda vacia) cuenta como 0
+            args = [column[i] if column[i] == column[i] else 0 for column in columns]
+            args += [_prom_python(group, i) for group in groups]
+            for values, value in zip(results, calcular(*args)):
+                values.append(value)
+
+    return {
+        indice: (values, formato)
+        for (nombre, formato, indice), values in zip(evaluador.salidas, results)
+        if indice is not None
+    }
@@ -0,0 +1,213 @@
+import ast
+import re
+
+from CalifEngine import np, redondear_calif, redondear_calif_np
+
+# esquema de siempre: mismos pesos y reglas que tenia analisis_calif
+ESQUEMA_DEFAULT = """
+# PA vacios no cuentan en el promedio; Q1, Q2, LAB y EXA vacios valen 0
+CAL:.2f = prom(PA) * 0.10 + (Q1 + Q2) / 2 * 0.20 + LAB * 0.40 + EXA * 0.30
+# menos de 7 es 0, desde 7 se redondea .5 hacia arriba
+RED:.1f = redondeo(CAL, 7)
+"""
+
+# NOMBRE[:formato] = expresion
+_LINEA = re.compile(r'^\s*([A-Za-z_]\w*)\s*(?::\s*([^=\s]+))?\s*=\s*(.+)$')
+
+_OPERADORES = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/'
+}
+
+_FUNCIONES = ('prom', 'redondeo', 'min', 'max')
+
+
+def _prom_fila(row, n, indices):
+    # promedio de las celdas con numero; vacias o con texto no cuentan
+    values = []
+    for idx in indices:
+        if idx < n and row[idx]:
+            try:
+                values.append(float(row[idx]))
+            except ValueError:
+                pass
+    return sum(values) / len(values) if values else 0
+
+
+def _validar(arbol, numero):
+    # solo aritmetica, numeros, nombres de columna y las funciones conocidas
+    for nodo in ast.walk(arbol.body):
+        if isinstance(nodo, ast.BinOp) and type(nodo.op) in _OPERADORES:
+            continue
+        if isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, (ast.USub, ast.UAdd)):
+            continue
+        if isinstance(nodo, ast.Constant) and type(nodo.value) in (int, float):
+            continue
+        if isinstance(nodo, (ast.Name, ast.operator, ast.unaryop, ast.expr_context)):
+            continue
+        if isinstance(nodo, ast.Call) and isinstance(nodo.func, ast.Name) and nodo.func.id in _FUNCIONES and not nodo.keywords:
+            if nodo.func.id == 'prom':
+                if len(nodo.args) != 1 or not isinstance(nodo.args[0], ast.Name):
+                    raise ValueError(f"Linea {numero} del esquema: prom() recibe el nombre de una columna")
+            elif len(nodo.args) != 2:
+                raise ValueError(f"Linea {numero} del esquema: {nodo.func.id}() recibe dos argumentos")
+            continue
+        raise ValueError(f"Linea {numero} del esquema: expresion no permitida '{ast.unparse(nodo)}'")
+
+
+class EsquemaCalif:
+    """
+    Esquema de calificacion declarado como texto, una formula por linea
+
+        CAL:.2f = prom(PA) * 0.10 + (Q1 + Q2) / 2 * 0.20 + LAB * 0.40 + EXA * 0.30
+        RED:.1f = redondeo(CAL, 7)
+
+    Los nombres se buscan en el encabezado (sin importar mayusculas) o son
+    resultados de lineas anteriores. prom(COL) promedia todas las columnas COL
+    sin contar vacios; una columna sola vacia vale 0.
+    """
+    def __init__(self, texto=ESQUEMA_DEFAULT):
+        self.formulas = []
+        for numero, linea in enumerate(texto.splitlines(), 1):
+            linea = linea.strip()
+            if not linea or linea.startswith('#'):
+                continue
+            match = _LINEA.match(linea)
+            if not match:
+                raise ValueError(f"Linea {numero} del esquema invalida: '{linea}'")
+            nombre, formato, expresion = match.groups()
+            formato = formato or '.2f'
+            try:
+                format(1.0, formato)
+                arbol = ast.parse(expresion, mode='eval')
+            except (ValueError, SyntaxError) as e:
+                raise ValueError(f"Linea {numero} del esquema invalida: {e}")
+            _validar(arbol, numero)
+            self.formulas.append((nombre.upper(), formato, arbol))
+
+        if not self.formulas:
+            raise ValueError("El esquema no tiene formulas")
+
+    @classmethod
+    def desde_archivo(cls, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls(file.read())
+
+    def compilar(self, header):
+        """
+        Genera el evaluador para un encabezado (None si faltan columnas)
+        """
+        try:
+            return EvaluadorCalif(self, header)
+        except KeyError:
+            return None
+
+
+class EvaluadorCalif:
+    """
+    Formulas de un EsquemaCalif compiladas a codigo python para un encabezado dado
+
+    fila(row) calcula una fila de strings; calcular(*valores) y calcular_np(*arrays)
+    evaluan las mismas expresiones sobre valores sueltos o sobre columnas completas.
+    """
+    def __init__(self, esquema, header):
+        self.header = header
+        self.columnas = {}      # nombre -> indice de la columna sola
+        self.grupos = {}        # nombre -> indices promediados con prom()
+        self.salidas = []       # (nombre, formato, indice en el encabezado o None)
+
+        self._nombres = [h.upper() for h in header]
+        self._resultados = {}
+        lineas = []
+        for numero, (nombre, formato, arbol) in enumerate(esquema.formulas):
+            lineas.append(f"t{numero} = {self._emitir(arbol.body)}")
+            self._resultados[nombre] = f"t{numero}"
+            indice = self._nombres.index(nombre) if nombre in self._nombres else None
+            self.salidas.append((nombre, formato, indice))
+
+        cuerpo = [f"    {linea}" for linea in lineas]
+        salida = f"    return ({', '.join(f't{i}' for i in range(len(lineas)))},)"
+        argumentos = [f"c{i}" for i in self.columnas.values()] + [f"p{k}" for k in range(len(self.grupos))]
+
+        # version por fila: extrae las celdas y evalua
+        fila = ["def _fila(row):", "    n = len(row)"]
+        for i in self.columnas.values():
+            fila.append(f"    c{i} = float(row[{i}]) if {i} < n and row[{i}] else 0")
+        for k, indices in enumerate(self.grupos.values()):
+            fila.append(f"    p{k} = _prom_fila(row, n, {tuple(indices)!r})")
+        fila += cuerpo + [salida]
+
+        # version por columnas: mismos calculos con los valores como argumentos
+        calcular = [f"def _calcular({', '.join(argumentos)}):"] + cuerpo + [salida]
+
+        self.codigo = '\n'.join(fila) + '\n\n' + '\n'.join(calcular) + '\n'
+        codigo = compile(self.codigo, '<esquema de calificacion>', 'exec')
+
+        ambiente = {'_prom_fila': _prom_fila, '_redondeo': redondear_calif, '_min': min, '_max': max}
+        exec(codigo, ambiente)
+        self._fila = ambiente['_fila']
+        self.calcular = ambiente['_calcular']
+
+        self.calcular_np = None
+        if np is not None:
+            ambiente = {'_redondeo': redondear_calif_np, '_min': np.minimum, '_max': np.maximum}
+            exec(codigo, ambiente)
+            self.calcular_np = ambiente['_calcular']
+
+    def _columna(self, nombre):
+        if nombre not in self.columnas:
+            if nombre not in self._nombres:
+                raise KeyError(nombre)
+            self.columnas[nombre] = self._nombres.index(nombre)
+        return f"c{self.columnas[nombre]}"
+
+    def _grupo(self, nombre):
+        if nombre not in self.grupos:
+            indices = [i for i, h in enumerate(self._nombres) if h == nombre]
+            if not indices:
+                raise KeyError(nombre)
+            self.grupos[nombre] = indices
+        return f"p{list(self.grupos).index(nombre)}"
+
+    def _emitir(self, nodo):
+        # el arbol ya se valido en EsquemaCalif; parentesis explicitos para que el
+        # orden de las operaciones quede igual que en la formula
+        if isinstance(nodo, ast.BinOp):
+            return f"({self._emitir(nodo.left)} {_OPERADORES[type(nodo.op)]} {self._emitir(nodo.right)})"
+        if isinstance(nodo, ast.UnaryOp):
+            signo = '-' if isinstance(nodo.op, ast.USub) else '+'
+            return f"({signo}{self._emitir(nodo.operand)})"
+        if isinstance(nodo, ast.Constant):
+            return repr(nodo.value)
+        if isinstance(nodo, ast.Name):
+            nombre = nodo.id.upper()
+            if nombre in self._resultados:
+                return self._resultados[nombre]
+            return self._columna(nombre)
+        if nodo.func.id == 'prom':
+            return self._grupo(nodo.args[0].id.upper())
+        return f"_{nodo.func.id}({', '.join(self._emitir(arg) for arg in nodo.args)})"
+
+    def describir(self):
+        """
+        Lineas con las columnas que usa el esquema
+        """
+        lineas = [f"Columnas {nombre} encontradas en indices: {indices}" for nombre, indices in self.grupos.items()]
+        if self.columnas:
+            lineas.append(', '.join(f"{nombre}: {indice}" for nombre, indice in self.columnas.items()))
+        return lineas
+
+    def fila(self, row):
+        """
+        Copia de la fila con los resultados escritos en sus columnas del encabezado
+        """
+        new_row = row.copy()
+        for (nombre, formato, indice), value in zip(self.salidas, self._fila(row)):
+            if indice is None:
+                continue
+            while len(new_row) <= indice:
+                new_row.append("")
+            new_row[indice] = format(value, formato)
+        return new_row
@@ -1,12 +1,37 @@
+import io
+import os
+import csv
 import sys
-from antlr4 import *
-from CSVLexer import CSVLexer
-from CSVParser import CSVParser
-from FileCSVVisitorImpl import FileCSVVisitorImpl
+import time
+import argparse
+from contextlib import ExitStack, redirect_stdout
+from CSVParsing import PARSE_MODES, MODOS_MMAP, parse_csv, parse_columns, iter_csv_rows, iter_file_rows
+from CSVMmapStream import MmapCharStream
+from CSVColumns import ColumnarCSV
+from CSVCache import ParseCache, CACHE_DIR
+from CSVIncremental import IncrementalParser
+from CalifEngine import calcular_columnas
+from CalifFormula import EsquemaCalif
+from CSVMetricas import Metricas, SIN_METRICAS
+from CSVPerfil import perfilar, tabla_grupos
+from CSVLote import expandir_rutas, es_lote, analizar_lote
+from CSVSalida import EscritorCSV, ruta_salida, escribir_al_pasar
+from CSVReporte import NIVELES, MUESTRA, Reporte, ResumenColumnas
+from CSVEstadisticas import EstadisticasCSV
+from CSVPerfilColumnas import PerfilColumnas, TOP
+from CSVValidacion import VALIDACION_DEFAULT, LIMITE_ADVERTENCIAS, Validacion, ReglasValidacion
+from CSVSQLite import ExportacionSQLite, tabla_de
+
+# linea de cada fila en los listados de datos y resultados
+def formato_fila(i, row):
+    return f"Fila {i}: {row}"
 
 # funcion auxiliar para analisar las calificaciones
-def analisis_calif(result):
-    print("\n...:: ANALISIS DE CALIFICACIONES ::...")
+# con salida cada fila calculada se escribe ahi en cuanto se imprime (rows queda en None)
+# con sqlite (ExportacionSQLite) las filas tambien se cargan a la base conforme pasan
+def analisis_calif(result, esquema=None, salida=None, reporte=None, sqlite=None):
+    reporte = reporte or Reporte()
+    reporte.info("\n...:: ANALISIS DE CALIFICACIONES ::...")
     
     if not result or not result['header']:
         print("No se puede realizar analisis: falta encabezado")
@@ -15,106 +40,112 @@ def analisis_calif(result):
     header = result['header']
     
     try:
-        pa_indices = [i for i, h in enumerate(header) if h.upper() == 'PA']
-        q1_index = next((i for i, h in enumerate(header) if h.upper() == 'Q1'), None)
-        q2_index = next((i for i, h in enumerate(header) if h.upper() == 'Q2'), None)
-        lab_index = next((i for i, h in enumerate(header) if h.upper() == 'LAB'), None)
-        exa_index = next((i for i, h in enumerate(header) if h.upper() == 'EXA'), None)
-        cal_index = next((i for i, h in enumerate(header) if h.upper() == 'CAL'), None)
-        red_index = next((i for i, h in enumerate(header) if h.upper() == 'RED'), None)
+        # el esquema se compila una sola vez para este encabezado
+        evaluador = (esquema or EsquemaCalif()).compilar(header)
         
-        if not pa_indices or q1_index is None or q2_index is None or lab_index is None or exa_index is None:
+        if evaluador is None:
             print("Advertencia: No se encontraron todas las columnas necesarias para el analisis")
+            if sqlite is not None:
+                # sin calificaciones se cargan las filas tal como se parsearon
+                cargar_sqlite(sqlite, header, result['rows'])
             return None
         
-        print(f"Columnas PA encontradas en indices: {pa_indices}")
-        print(f"Q1: {q1_index}, Q2: {q2_index}, LAB: {lab_index}, EXA: {exa_index}")
+        for linea in evaluador.describir():
+            reporte.info(linea)
         
-        processed_rows = []
+        if 'columnas' in result:
+            # resultado columnar: sin volver a convertir cada celda con float()
+            computed = calcular_columnas(result['columnas'], evaluador)
+            processed_rows = result['columnas'].with_columns(computed).as_result()['rows']
+        elif salida:
+            # se calcula cada fila justo antes de escribirla, sin juntar la lista
+            processed_rows = (evaluador.fila(row) for row in result['rows'])
+        else:
+            processed_rows = [evaluador.fila(row) for row in result['rows']]
         
-        for row in result['rows']:
-            new_row = row.copy()
-            
-            pa_values = []
-            for idx in pa_indices:
-                if idx < len(row) and row[idx]:
-                    try:
-                        pa_values.append(float(row[idx]))
-                    except ValueError:
-                        pass
-            
-
-            # calculos de promedios y calificaciones
-            promedio_pa = sum(pa_values) / len(pa_values) if pa_values else 0
-            
-            q1 = float(row[q1_index]) if q1_index < len(row) and row[q1_index] else 0
-            q2 = float(row[q2_index]) if q2_index < len(row) and row[q2_index] else 0
-            promedio_q = (q1 + q2) / 2
-            
-            lab = float(row[lab_index]) if lab_index < len(row) and row[lab_index] else 0
-            exa = float(row[exa_index]) if exa_index < len(row) and row[exa_index] else 0
-            
-            cal = (promedio_pa * 0.10) + (promedio_q * 0.20) + (lab * 0.40) + (exa * 0.30)
-            
-            # reglas de redondeo
-            if cal < 7:
-                red = 0.0
-            else:
-                fractional_part = cal - int(cal)
-                if fractional_part >= 0.5:
-                    red = float(int(cal) + 1)
-                else:
-                    red = float(int(cal))
-            
-            if cal_index is not None and cal_index < len(new_row):
-                new_row[cal_index] = f"{cal:.2f}"
-            elif cal_index is not None:
-                while len(new_row) <= cal_index:
-                    new_row.append("")
-                new_row[cal_index] = f"{cal:.2f}"
-            
-            if red_index is not None and red_index < len(new_row):
-                new_row[red_index] = f"{red:.1f}"
-            elif red_index is not None:
-                while len(new_row) <= red_index:
-                    new_row.append("")
-                new_row[red_index] = f"{red:.1f}"
-            
-            processed_rows.append(new_row)
+        reporte.info("\n--- RESULTADOS CON CALIFICACIONES CALCULADAS ---")
+        reporte.info(f"Encabezado: {header}")
+        
+        # en resumen se acumulan las columnas calculadas mientras pasan las filas
+        rows = processed_rows
+        resumen = None
+        if reporte.nivel == 'resumen':
+            resumen = ResumenColumnas({nombre: indice for nombre, _, indice in evaluador.salidas if indice is not None})
+            rows = resumen.pasar(rows)
+        
+        carga = None
+        with ExitStack() as destinos:
+            if salida:
+                escritor = destinos.enter_context(EscritorCSV(salida))
+                escritor.write_row(header)
+                rows = escribir_al_pasar(escritor, rows)
+                processed_rows = None
+            if sqlite is not None:
+                calificadas = [indice for _, _, indice in evaluador.salidas if indice is not None]
+                carga = destinos.enter_context(sqlite.abrir(header, calificadas))
+                rows = escribir_al_pasar(carga, rows)
+            total_rows = reporte.filas(rows, formato_fila)
         
-        print("\n--- RESULTADOS CON CALIFICACIONES CALCULADAS ---")
-        print(f"Encabezado: {header}")
-        for i, row in enumerate(processed_rows, 1):
-            print(f"Fila {i}: {row}")
+        if resumen is not None:
+            reporte.estadistica("\n--- ESTADISTICAS DE CALIFICACIONES ---")
+            for linea in resumen.lineas():
+                reporte.estadistica(linea)
+        if salida:
+            print(f"\nArchivo guardado exitosamente: {salida}")
+        if carga is not None:
+            print()
+            for linea in carga.lineas():
+                print(linea)
         
         return {
             'header': header,
-            'rows': processed_rows
+            'rows': processed_rows,
+            'total_rows': total_rows
         }
         
     except Exception as e:
         print(f"Error en analisis de calificaciones: {str(e)}")
         return None
 
-def save_csv_option(result):
+# carga header y rows a SQLite de una vez (cuando no hay calificaciones que calcular)
+def cargar_sqlite(sqlite, header, rows):
+    with sqlite.abrir(header) as carga:
+        for row in rows:
+            carga.write_row(row)
+    print()
+    for linea in carga.lineas():
+        print(linea)
+
+# pregunta si se guarda el resultado y regresa la ruta destino (None si no se guarda)
+def pedir_archivo_salida():
     print("\n...:: GUARDAR ARCHIVO CSV ::...")
     print("¿Desea guardar el resultado en un archivo CSV? (s/n): ", end="")
     
+    response = input().strip().lower()
+    if response != 's':
+        return None
+    
+    print("Nombre del archivo (sin extension): ", end="")
+    filename = input().strip()
+    if not filename:
+        filename = "resultado" # nombre default
+    
+    return f"{filename}.csv"
+
+# escribe el encabezado y las filas conforme llegan (rows puede ser un generador)
+def escribir_csv(filepath, header, rows):
+    with EscritorCSV(filepath) as escritor:
+        escritor.write_row(header)
+        for row in rows:
+            escritor.write_row(row)
+
+def save_csv_option(result, metricas=SIN_METRICAS):
     try:
-        response = input().strip().lower()
-        if response == 's':
-            print("Nombre del archivo (sin extension): ", end="")
-            filename = input().strip()
-            if not filename:
-                filename = "resultado" # nombre default
-            
-            filepath = f"{filename}.csv"
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(','.join(result['header']) + '\n')
-                for row in result['rows']:
-                    f.write(','.join(str(field) for field in row) + '\n')
-            
+        filepath = pedir_archivo_salida()
+        if filepath:
+            with metricas.fase('escritura') as fase:
+                escribir_csv(filepath, result['header'], result['rows'])
+                fase['filas'] = len(result['rows']) + 1
             print(f"Archivo guardado exitosamente: {filepath}")
         else:
             print("Archivo no guardado")
@@ -122,6 +153,12 @@ def save_csv_option(result):
         print(f"Error al guardar archivo: {str(e)}")
 
 def validate_csv_structure(input_text):
+    if isinstance(input_text, MmapCharStream):
+        # archivo mapeado: no se parte en lineas, basta con encontrar algo que no sea espacio
+        if not input_text.tiene_contenido():
+            return False, "Archivo vacio"
+        return True, "Estructura valida de CSV"
+    
     lines = input_text.split('\n')
     non_empty_lines = [line for line in lines if line.strip() or ',' in line]
     
@@ -130,8 +167,19 @@ def validate_csv_structure(input_text):
     
     return True, "Estructura valida de CSV"
 
-def analyze_csv(input_text):
-    print(f"\n... ANALIZANDO CSV ...\n")
+# bytes de la entrada para las tasas de las metricas (texto o MmapCharStream)
+def bytes_entrada(input_text):
+    if isinstance(input_text, str):
+        return len(input_text.encode('utf-8'))
+    return os.path.getsize(input_text.name)
+
+# salida: None pregunta si se guarda, False no guarda ni pregunta, una ruta guarda ahi sin preguntar
+# reporte: nivel de detalle de lo que se imprime (default: completo)
+# validacion: reglas de rango de las calificaciones (None no valida)
+def analyze_csv(input_text, modo='rapido', columnar=False, esquema=None, cache=None, metricas=None, salida=None,
+                reporte=None, validacion=VALIDACION_DEFAULT, sqlite=None, **opciones):
+    reporte = reporte or Reporte()
+    reporte.info(f"\n... ANALIZANDO CSV ...\n")
     
     is_valid, message = validate_csv_structure(input_text)
     if not is_valid:
@@ -140,47 +188,134 @@ def analyze_csv(input_text):
         return None
     
     try:
-        # configurar el antlr4
-        input_stream = InputStream(input_text)
-        lexer = CSVLexer(input_stream)
-        token_stream = CommonTokenStream(lexer)
-        parser = CSVParser(token_stream)
-        parser.removeErrorListeners()
-        tree = parser.csvFile()
-        
-        # Visita el arbol para extraer datos ( visitor personalizado )
-        visitor = FileCSVVisitorImpl()
+        # configurar el antlr4 y recorrer la entrada ( visitor o listener personalizado )
         # resultados del analisis
-        result = visitor.visit(tree)
+        # un archivo sin cambios se toma del cache sin volver a parsearlo (la llave incluye el modo)
+        # (con mmap no hay texto completo que usar como llave y el cache no guarda el diagnostico;
+        # con --columnar tampoco: guardar y leer la lista de filas anularia el ahorro de memoria)
+        if not isinstance(input_text, str) or modo == 'diagnostico' or columnar:
+            cache = None
+        # las estadisticas por columna solo se imprimen en resumen; en los demas niveles el parser solo cuenta
+        opciones['por_columna'] = reporte.nivel == 'resumen'
+        # sin metricas cada fase pasa por SIN_METRICAS, que no mide nada
+        medidor = SIN_METRICAS
+        if metricas is not None:
+            metricas.modo = metricas.modo or modo
+            metricas.bytes_entrada = metricas.bytes_entrada or bytes_entrada(input_text)
+            medidor = metricas
+        
+        result = None
+        if cache is not None:
+            with medidor.fase('cache'):
+                result = cache.get(input_text, modo)
+        if result is None:
+            if columnar:
+                result = parse_columns(input_text, modo, medidor, **opciones).as_result()
+            else:
+                result = parse_csv(input_text, modo, medidor, **opciones)
+            if cache is not None:
+                cache.put(input_text, result, modo)
+        else:
+            reporte.info("(resultado tomado del cache)")
         #print(result)
         #print("..:: CSV VALIDO ::.. \n")
         
-        total_rows = len(result['rows']) + (1 if result['header'] else 0)
-        num_columns = len(result['header']) if result['header'] else 0
-        total_fields = result['total_fields']
-        empty_fields = sum(1 for row in result['rows'] for field in row if field == "")
-        if result['header']:
-            empty_fields += sum(1 for field in result['header'] if field == "")
-        
-        print(f"Total de filas: {total_rows}") # segun filas contadas
-        print(f"Total de columnas: {num_columns}") # segun encabezado
-        print(f"Total de campos: {total_fields}")
-        #print(f"Campos vacios detectados: {empty_fields}")
+        result = report_csv(result, esquema, medidor, salida, reporte, validacion, sqlite)
+        if metricas is not None:
+            result['metricas'] = metricas.como_dict()
+        return result
         
-        if result['header']:
-            print(f"\nEncabezados: {result['header']}")
+    except Exception as error:
+        print(f"..:: ERROR DE PARSEO ::.. ")
+        print(f"Error: {str(error)}")
+        return None
+
+# campos vacios y estadisticas por columna (solo salen con --verbosidad resumen)
+def reporte_estadisticas(estadisticas, reporte):
+    reporte.estadistica(f"Campos vacios detectados: {estadisticas.vacios}")
+    reporte.estadistica("\n--- ESTADISTICAS POR COLUMNA ---")
+    for linea in estadisticas.lineas():
+        reporte.estadistica(linea)
+
+# imprime el resumen y los datos, calcula calificaciones y ofrece guardar (salida igual que en analyze_csv)
+def report_csv(result, esquema=None, metricas=SIN_METRICAS, salida=None, reporte=None, validacion=VALIDACION_DEFAULT,
+               sqlite=None):
+    reporte = reporte or Reporte()
+    if result.get('diagnostico') is not None:
+        # los errores salen en cualquier nivel; sin errores solo se avisa fuera de silencioso
+        lineas = result['diagnostico'].lineas()
+        if result['diagnostico'].total:
+            for linea in lineas:
+                print(linea)
+        else:
+            reporte.info(lineas[0])
+    if validacion is not None:
+        # una pasada por columna, despues del parseo; las advertencias salen agrupadas y con limite
+        with metricas.fase('validacion'):
+            result['validacion'] = validacion.validar(result)
+        for linea in result['validacion'].lineas():
+            print(linea)
+    
+    total_rows = len(result['rows']) + (1 if result['header'] else 0)
+    num_columns = len(result['header']) if result['header'] else 0
+    total_fields = result['total_fields']
+    
+    reporte.info(f"Total de filas: {total_rows}") # segun filas contadas
+    reporte.info(f"Total de columnas: {num_columns}") # segun encabezado
+    reporte.info(f"Total de campos: {total_fields}")
+    if 'prediccion' in result:
+        reporte.info(f"Prediccion usada: {result['prediccion']}")
+    if reporte.nivel == 'resumen':
+        # el parser ya las acumulo; solo se recorren las filas si el resultado no las trae
+        # (por ejemplo un resultado del cache guardado desde otro nivel)
+        estadisticas = result.get('estadisticas')
+        if estadisticas is None or not estadisticas.por_columna:
+            estadisticas = EstadisticasCSV.de_filas([result['header']] + list(result['rows']))
+        reporte_estadisticas(estadisticas, reporte)
+    
+    if result['header']:
+        reporte.info(f"\nEncabezados: {result['header']}")
+    
+    reporte.info("\n--- DATOS ---")
+    if result['header']:
+        reporte.info(f"Fila 1 (encabezado): {result['header']}")
+    reporte.filas(result['rows'], formato_fila, 2 if result['header'] else 1)
+    
+    #usamos la funcion auxiliar para las calificaciones
+    # con una ruta de salida la escritura va dentro de esta fase
+    with metricas.fase('analisis_calif') as fase:
+        calif_result = analisis_calif(result, esquema, salida, reporte, sqlite)
+        fase['filas'] = calif_result['total_rows'] + 1 if calif_result else None
+    if calif_result and salida is None:
+        save_csv_option(calif_result, metricas)
+
+    return result
+
+# modo incremental: solo se parsea lo que se agrego al archivo desde la ultima corrida
+def analyze_csv_incremental(path, modo='rapido', columnar=False, esquema=None, directorio=CACHE_DIR, metricas=None, salida=None,
+                            reporte=None, validacion=VALIDACION_DEFAULT, sqlite=None, **opciones):
+    reporte = reporte or Reporte()
+    reporte.info(f"\n... ANALIZANDO CSV (incremental) ...\n")
+    
+    medidor = metricas if metricas is not None else SIN_METRICAS
+    try:
+        with medidor.fase('parseo') as fase:
+            result, tipo, filas_nuevas = IncrementalParser(directorio).parse(path, modo, por_columna=reporte.nivel == 'resumen',
+                                                                             **opciones)
+            fase['filas'] = filas_nuevas
+        if result['header'] is None:
+            print(f"..:: FORMATO INVALIDO ::.. \n")
+            print(f"Razon: Archivo vacio")
+            return None
         
-        print("\n--- DATOS ---")
-        if result['header']:
-            print(f"Fila 1 (encabezado): {result['header']}")
-        for i, row in enumerate(result['rows'], 2 if result['header'] else 1):
-            print(f"Fila {i}: {row}")
+        reporte.info(f"(parseo {tipo}: {filas_nuevas} filas parseadas)")
+        if columnar:
+            with medidor.fase('columnas'):
+                result = ColumnarCSV.from_result(result).as_result()
         
-        #usamos la funcion auxiliar para las calificaciones
-        calif_result = analisis_calif(result)
-        if calif_result:
-            save_csv_option(calif_result)
-
+        result = report_csv(result, esquema, medidor, salida, reporte, validacion, sqlite)
+        if metricas is not None:
+            result['metricas'] = metricas.como_dict()
         return result
         
     except Exception as error:
@@ -188,23 +323,439 @@ def analyze_csv(input_text):
         print(f"Error: {str(error)}")
         return None
 
+# modo streaming: cada fila se analiza y se escribe en cuanto el parser la termina
+def analyze_csv_stream(path, esquema=None, metricas=None, salida=None, reporte=None, validacion=VALIDACION_DEFAULT,
+                       sqlite=None):
+    reporte = reporte or Reporte()
+    reporte.info(f"\n... ANALIZANDO CSV (streaming) ...\n")
+    
+    rows = iter_csv_rows(path)
+    header = next(rows, None)
+    if header is None:
+        print(f"..:: FORMATO INVALIDO ::.. \n")
+        print(f"Razon: Archivo vacio")
+        return None
+    
+    reporte.info(f"\nEncabezados: {header}")
+    evaluador = (esquema or EsquemaCalif()).compilar(header)
+    if evaluador is None:
+        print("Advertencia: No se encontraron todas las columnas necesarias para el analisis")
+    
+    filepath = salida if evaluador else None
+    try:
+        if evaluador and salida is None:
+            filepath = pedir_archivo_salida()
+    except Exception as e:
+        print(f"Error al guardar archivo: {str(e)}")
+        filepath = None
+    
+    # totales y estadisticas se acumulan conforme pasan las filas (sin guardarlas); las por columna solo en resumen
+    estadisticas = EstadisticasCSV(por_columna=reporte.nivel == 'resumen')
+    estadisticas.agregar_fila(header)
+    # la validacion toma las filas por bloques antes de calcular las calificaciones
+    validador = validacion.validador(header) if validacion is not None else None
+    
+    def processed_rows():
+        for row in (validador.validar_iter(rows) if validador else rows):
+            estadisticas.agregar_fila(row)
+            if evaluador:
+                row = evaluador.fila(row)
+            yield row
+    
+    # lexer, parser, calificaciones y escritura van intercalados: se miden como una sola fase
+    medidor = metricas if metricas is not None else SIN_METRICAS
+    carga = None
+    try:
+        with medidor.fase('streaming') as fase:
+            reporte.info("\n--- DATOS ---")
+            with ExitStack() as destinos:
+                rows_salida = processed_rows()
+                if filepath:
+                    escritor = destinos.enter_context(EscritorCSV(filepath))
+                    escritor.write_row(header)
+                    rows_salida = escribir_al_pasar(escritor, rows_salida)
+                if sqlite is not None:
+                    calificadas = [indice for _, _, indice in evaluador.salidas if indice is not None] if evaluador else []
+                    carga = destinos.enter_context(sqlite.abrir(header, calificadas))
+                    rows_salida = escribir_al_pasar(carga, rows_salida)
+                # misma numeracion que la validacion y report_csv: el encabezado es la fila 1
+                reporte.filas(rows_salida, formato_fila, 2)
+            if filepath:
+                print(f"Archivo guardado exitosamente: {filepath}")
+            fase['filas'] = estadisticas.filas
+    except Exception as error:
+        print(f"..:: ERROR DE PARSEO ::.. ")
+        print(f"Error: {str(error)}")
+        return None
+    
+    if validador:
+        for linea in validador.reporte.lineas():
+            print(linea)
+    reporte.info(f"\nTotal de filas: {estadisticas.filas}")
+    reporte.info(f"Total de columnas: {len(header)}")
+    reporte.info(f"Total de campos: {estadisticas.campos}")
+    reporte_estadisticas(estadisticas, reporte)
+    if carga is not None:
+        print()
+        for linea in carga.lineas():
+            print(linea)
+    
+    result = {
+        'header': header,
+        'total_rows': estadisticas.filas,
+        'total_fields': estadisticas.campos,
+        'estadisticas': estadisticas
+    }
+    if validador:
+        result['validacion'] = validador.reporte
+    if metricas is not None:
+        result['metricas'] = metricas.como_dict()
+    return result
+
+# perfil de columnas: una pasada en streaming con memoria fija por columna (sin calificaciones)
+def profile_columns_csv(path, top=TOP, metricas=None):
+    print(f"\n... PERFIL DE COLUMNAS ...\n")
+    
+    perfil = PerfilColumnas(top)
+    medidor = metricas if metricas is not None else SIN_METRICAS
+    try:
+        with medidor.fase('perfil_columnas') as fase:
+            for row in iter_csv_rows(path):
+                perfil.agregar_fila(row)
+            fase['filas'] = perfil.filas + 1
+    except Exception as error:
+        print(f"..:: ERROR DE PARSEO ::.. ")
+        print(f"Error: {str(error)}")
+        return None
+    if perfil.encabezado is None:
+        print(f"..:: FORMATO INVALIDO ::.. \n")
+        print(f"Razon: Archivo vacio")
+        return None
+    
+    print(f"Total de filas: {perfil.filas + 1}")
+    print(f"Total de columnas: {len(perfil.columnas)}")
+    print("\n--- COLUMNAS (valores aproximados) ---")
+    print('\n'.join(perfil.lineas()))
+    
+    result = {
+        'header': perfil.encabezado,
+        'total_rows': perfil.filas + 1,
+        'perfil': perfil
+    }
+    if metricas is not None:
+        result['metricas'] = metricas.como_dict()
+    return result
+
+# modo filtro (archivo '-'): CSV de stdin a stdout con las calificaciones calculadas
+# stdout solo lleva el CSV (con comillas donde hagan falta); avisos y totales van a stderr
+def filter_csv(entrada=None, salida=None, esquema=None, validacion=VALIDACION_DEFAULT):
+    entrada = entrada or io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    propia = salida is None
+    if propia:
+        salida = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='')
+    
+    try:
+        # advertencias y totales van a stderr
+        with redirect_stdout(sys.stderr):
+            rows = iter_file_rows(entrada)
+            header = next(rows, None)
+            if header is None:
+                print(f"..:: FORMATO INVALIDO ::.. ")
+                print(f"Razon: Archivo vacio")
+                return None
+            
+            evaluador = (esquema or EsquemaCalif()).compilar(header)
+            if evaluador is None:
+                print("Advertencia: No se encontraron todas las columnas necesarias para el analisis")
+            
+            validador = validacion.validador(header) if validacion is not None else None
+            if validador:
+                rows = validador.validar_iter(rows)
+            
+            writer = csv.writer(salida, lineterminator='\n')
+            writer.writerow(header)
+            totals = {'rows': 1, 'fields': len(header)}
+            for row in rows:
+                totals['rows'] += 1
+                totals['fields'] += len(row)
+                writer.writerow(evaluador.fila(row) if evaluador else row)
+            salida.flush()
+            
+            if validador:
+                for linea in validador.reporte.lineas():
+                    print(linea)
+            print(f"Total de filas: {totals['rows']}")
+            print(f"Total de columnas: {len(header)}")
+            print(f"Total de campos: {totals['fields']}")
+    finally:
+        if propia:
+            # se suelta sys.stdout.buffer sin cerrarlo
+            try:
+                salida.flush()
+            finally:
+                salida.detach()
+    
+    return {
+        'header': header,
+        'total_rows': totals['rows'],
+        'total_fields': totals['fields']
+    }
+
+# varios archivos: cada uno se analiza en un proceso y al final se imprime el total
+def analyze_csv_batch(patrones, modo='rapido', columnar=False, esquema=None, workers=None, carpeta_salida=None,
+                      validacion=VALIDACION_DEFAULT):
+    rutas = expandir_rutas(patrones)
+    print(f"\n... ANALIZANDO LOTE: {len(rutas)} archivos ...\n")
+    
+    inicio = time.perf_counter()
+    resumenes = analizar_lote(rutas, modo, columnar, esquema, workers, carpeta_salida, validacion)
+    segundos = time.perf_counter() - inicio
+    
+    for resumen in resumenes:
+        if resumen['error']:
+            print(f"[error] {resumen['archivo']}: {resumen['error']}")
+            continue
+        calificadas = (f"{resumen['calificadas']} calificadas" if resumen['calificadas'] is not None
+                       else "sin columnas de calificacion")
+        avisos = f", {resumen['advertencias']} advertencias" if resumen['advertencias'] else ""
+        guardado = f" -> {resumen['salida']}" if resumen['salida'] else ""
+        print(f"[ok]    {resumen['archivo']}: {resumen['filas']} filas, {resumen['columnas']} columnas, "
+              f"{resumen['campos']} campos, {calificadas}{avisos} ({resumen['segundos']:.2f} s){guardado}")
+    
+    fallidos = [r for r in resumenes if r['error']]
+    print("\n...:: RESUMEN DEL LOTE ::...")
+    print(f"Archivos: {len(resumenes)} (correctos: {len(resumenes) - len(fallidos)}, con error: {len(fallidos)})")
+    print(f"Total de filas: {sum(r['filas'] for r in resumenes)}")
+    print(f"Total de campos: {sum(r['campos'] for r in resumenes)}")
+    print(f"Tiempo total: {segundos:.2f} s (suma por archivo: {sum(r['segundos'] for r in resumenes):.2f} s)")
+    
+    return {
+        'archivos': resumenes,
+        'filas': sum(r['filas'] for r in resumenes),
+        'campos': sum(r['campos'] for r in resumenes),
+        'fallidos': len(fallidos),
+        'segundos': segundos
+    }
+
+def parse_args(argv):
+    arg_parser = argparse.ArgumentParser(description="Analizador CSV ANTLR4 (Python)")
+    arg_parser.add_argument('archivos', nargs='*',
+                            help="archivos CSV, globs o carpetas a analizar; con mas de uno se procesan "
+                                 "en paralelo y se imprime un resumen; '-' lee de stdin y escribe el CSV "
+                                 "calificado en stdout (sin archivo corre los ejemplos)")
+    arg_parser.add_argument('--salida', default=None, metavar='RUTA',
+                            help="guarda el CSV calificado en RUTA sin preguntar; si RUTA es una carpeta "
+                                 "(o termina en /) se escribe ahi <archivo>_resultado.csv")
+    arg_parser.add_argument('--sqlite', default=None, metavar='BASE',
+                            help="carga el encabezado y las filas calificadas en una tabla de la base SQLite BASE "
+                                 "(una transaccion, tipos inferidos, indices en la clave y las calificaciones)")
+    arg_parser.add_argument('--sqlite-tabla', default=None, metavar='TABLA',
+                            help="tabla de --sqlite; se reemplaza si existe (default: nombre del archivo)")
+    arg_parser.add_argument('--sqlite-clave', default=None, metavar='COLUMNA',
+                            help="columna clave con indice en --sqlite (default: la primera)")
+    arg_parser.add_argument('--sqlite-indices', default='', metavar='COLUMNAS',
+                            help="otras columnas con indice en --sqlite, separadas por coma (por ejemplo GRUPO)")
+    arg_parser.add_argument('--no-interactivo', action='store_true',
+                            help="no pregunta si se guarda el resultado (sin --salida no se guarda)")
+    arg_parser.add_argument('--verbosidad', choices=NIVELES, default='completo',
+                            help="silencioso: sin datos ni totales; resumen: totales, estadisticas y las primeras "
+                                 "y ultimas filas; completo: todas las filas (default)")
+    arg_parser.add_argument('--muestra', type=int, default=MUESTRA,
+                            help=f"filas que se muestran al inicio y al final con --verbosidad resumen (default: {MUESTRA})")
+    arg_parser.add_argument('--stream', action='store_true',
+                            help="procesa el archivo fila por fila con memoria acotada")
+    arg_parser.add_argument('--perfil-columnas', '--profile-columns', action='store_true',
+                            help="en lugar del analisis, perfila cada columna en una pasada con memoria fija: "
+                                 "nulos, distintos (HyperLogLog), cuantiles (KLL) y valores frecuentes (Space-Saving)")
+    arg_parser.add_argument('--top-valores', type=int, default=TOP,
+                            help=f"valores frecuentes que se listan por columna con --perfil-columnas (default: {TOP})")
+    arg_parser.add_argument('--modo', choices=sorted(PARSE_MODES), default='rapido',
+                            help="rapido: escaner propio con respaldo en antlr4; "
+                                 "arbol: visitor sobre el arbol completo; "
+                                 "listener: sin arbol, pero guarda todos los tokens (memoria O(archivo)); "
+                                 "sin_buffer: listener que descarta los tokens ya usados, memoria O(fila); "
+                                 "estricto: se detiene en el primer error de sintaxis y dice linea, columna y token; "
+                                 "diagnostico: sigue despues de cada error y los lista todos con linea y columna; "
+                                 "sll: prediccion SLL con reintento LL si falla; "
+                                 "paralelo: bloques repartidos en varios procesos")
+    arg_parser.add_argument('--columnar', action='store_true',
+                            help="guarda el resultado en columnas tipadas (array('d') para las numericas)")
+    arg_parser.add_argument('--esquema', default=None,
+                            help="archivo con las formulas de calificacion (default: pesos 0.10/0.20/0.40/0.30)")
+    arg_parser.add_argument('--reglas', default=None, metavar='ARCHIVO',
+                            help="archivo con los rangos validos por columna, una regla 'columna = min..max' por linea "
+                                 "(default: 3- = 0..10, de la tercera columna en adelante)")
+    arg_parser.add_argument('--sin-validacion', action='store_true',
+                            help="no valida los rangos de las calificaciones (entradas de confianza)")
+    arg_parser.add_argument('--max-advertencias', type=int, default=LIMITE_ADVERTENCIAS,
+                            help=f"advertencias de validacion que se listan; las demas solo se cuentan (default: {LIMITE_ADVERTENCIAS})")
+    arg_parser.add_argument('--mmap', action='store_true',
+                            help="lee el archivo con mmap y lo decodifica por ventanas "
+                                 f"(solo con --modo {', '.join(MODOS_MMAP)})")
+    arg_parser.add_argument('--incremental', action='store_true',
+                            help="solo parsea lo que se agrego al final del archivo desde la ultima corrida")
+    arg_parser.add_argument('--sin-cache', action='store_true',
+                            help="no lee ni guarda el resultado del parseo en el cache (implicito con --profile, --metricas y --columnar)")
+    arg_parser.add_argument('--cache-dir', default=CACHE_DIR,
+                            help=f"carpeta del cache de parseo (default: {CACHE_DIR})")
+    arg_parser.add_argument('--metricas', '--metrics', choices=('texto', 'json'), default=None,
+                            help="mide cada fase (tiempo, filas/s, bytes/s, tokens); json se escribe en stderr")
+    arg_parser.add_argument('--profile', nargs='?', const='perfil.pstats', default=None, metavar='ARCHIVO',
+                            help="corre el analisis con cProfile y guarda el volcado pstats (default: perfil.pstats) "
+                                 "y un resumen por grupo en ARCHIVO.txt")
+    arg_parser.add_argument('--profile-top', type=int, default=25,
+                            help="funciones que se listan en el resumen de --profile")
+    arg_parser.add_argument('--workers', type=int, default=None,
+                            help="procesos para --modo paralelo o para varios archivos (default: numero de CPUs)")
+    arg_parser.add_argument('--chunk-size', type=int, default=None,
+                            help="caracteres aproximados por bloque en --modo paralelo")
+    args = arg_parser.parse_args(argv[1:])
+    if args.stream:
+        # --stream siempre lee por bloques con el listener; estas opciones no se aplicarian
+        for opcion, activa in ((f'--modo {args.modo}', args.modo != 'rapido'), ('--columnar', args.columnar),
+                               ('--mmap', args.mmap), ('--incremental', args.incremental)):
+            if activa:
+                arg_parser.error(f"{opcion} no se puede usar con --stream")
+    if args.mmap and args.modo not in MODOS_MMAP:
+        arg_parser.error(f"--mmap necesita --modo {', '.join(MODOS_MMAP)}")
+    if args.incremental and args.modo == 'diagnostico':
+        # las lineas de los errores serian relativas a lo agregado
+        arg_parser.error("--incremental no se puede usar con --modo diagnostico")
+    if args.profile or args.metricas:
+        # con un resultado del cache solo se mediria la lectura del cache y no el parseo
+        args.sin_cache = True
+    
+    if args.perfil_columnas:
+        for opcion, activa in (('--stream', args.stream), ('--incremental', args.incremental), ('--mmap', args.mmap),
+                               ('--salida', args.salida), ('--sqlite', args.sqlite)):
+            if activa:
+                arg_parser.error(f"{opcion} no se puede usar con --perfil-columnas")
+    
+    args.lote = es_lote(args.archivos)
+    args.archivo = args.archivos[0] if args.archivos and not args.lote else None
+    if args.archivo == '-':
+        for opcion, activa in (('--salida', args.salida), ('--incremental', args.incremental), ('--mmap', args.mmap),
+                               ('--metricas', args.metricas), ('--profile', args.profile),
+                               ('--perfil-columnas', args.perfil_columnas), ('--sqlite', args.sqlite)):
+            if activa:
+                arg_parser.error(f"{opcion} no se puede usar leyendo de stdin ('-')")
+    if args.lote:
+        for opcion, activa in (('--stream', args.stream), ('--incremental', args.incremental), ('--mmap', args.mmap),
+                               ('--metricas', args.metricas), ('--profile', args.profile),
+                               ('--perfil-columnas', args.perfil_columnas), ('--modo paralelo', args.modo == 'paralelo'),
+                               ('--sqlite', args.sqlite)):
+            if activa:
+                arg_parser.error(f"{opcion} es solo para un archivo")
+    return args
+
+# destino del CSV calificado segun --salida / --no-interactivo (ver analyze_csv)
+def salida_de(args):
+    if args.salida:
+        return ruta_salida(args.salida, args.archivo)
+    return False if args.no_interactivo else None
+
+# validacion segun --reglas / --max-advertencias / --sin-validacion (ver analyze_csv)
+def validacion_de(args):
+    if args.sin_validacion:
+        return None
+    reglas = ReglasValidacion.desde_archivo(args.reglas) if args.reglas else None
+    return Validacion(reglas, args.max_advertencias)
+
+# exportacion a SQLite segun --sqlite / --sqlite-tabla / --sqlite-clave / --sqlite-indices (None sin --sqlite)
+def sqlite_de(args):
+    if not args.sqlite:
+        return None
+    indices = [nombre for nombre in args.sqlite_indices.split(',') if nombre.strip()]
+    return ExportacionSQLite(args.sqlite, args.sqlite_tabla or tabla_de(args.archivo), args.sqlite_clave, indices)
+
+# corre el analisis que piden los argumentos sobre args.archivo
+def analizar_archivo(args, esquema, opciones, metricas):
+    salida = salida_de(args)
+    reporte = Reporte(args.verbosidad, args.muestra)
+    validacion = validacion_de(args)
+    sqlite = sqlite_de(args)
+    if args.perfil_columnas:
+        return profile_columns_csv(args.archivo, args.top_valores, metricas)
+    if args.stream:
+        return analyze_csv_stream(args.archivo, esquema, metricas, salida, reporte, validacion, sqlite)
+    if args.incremental:
+        return analyze_csv_incremental(args.archivo, args.modo, args.columnar, esquema, args.cache_dir, metricas, salida,
+                                       reporte, validacion, sqlite, **opciones)
+    if args.mmap:
+        with MmapCharStream(args.archivo) as stream:
+            return analyze_csv(stream, args.modo, args.columnar, esquema, metricas=metricas, salida=salida, reporte=reporte,
+                               validacion=validacion, sqlite=sqlite)
+    with open(args.archivo, 'r', encoding='utf-8') as file:
+        content = file.read()
+    cache = None if args.sin_cache else ParseCache(args.cache_dir)
+    return analyze_csv(content, args.modo, args.columnar, esquema, cache, metricas, salida, reporte, validacion, sqlite,
+                       **opciones)
+
 def main(argv):
-    if len(argv) > 1:
+    args = parse_args(argv)
+    
+    if args.lote:
         try:
-            with open(argv[1], 'r', encoding='utf-8') as file:
-                content = file.read()
-            
-            print(f"... PROCESANDO ARCHIVO: {argv[1]} ...")
-            analyze_csv(content)
+            esquema = EsquemaCalif.desde_archivo(args.esquema) if args.esquema else None
+            # en lote --salida siempre es carpeta; sin ella no se guarda nada (nunca se pregunta)
+            analyze_csv_batch(args.archivos, args.modo, args.columnar, esquema, args.workers, args.salida,
+                              validacion_de(args))
+            print("\n... FIN DEL ANALISIS ...")
+        except Exception as e:
+            print(f"Error al procesar lote: {str(e)}")
+    
+    elif args.archivo == '-':
+        try:
+            esquema = EsquemaCalif.desde_archivo(args.esquema) if args.esquema else None
+            filter_csv(esquema=esquema, validacion=validacion_de(args))
+        except BrokenPipeError:
+            # el lector cerro la tuberia (por ejemplo | head): se termina sin ruido
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+        except Exception as e:
+            print(f"Error al procesar entrada: {str(e)}", file=sys.stderr)
+    
+    elif args.archivo:
+        try:
+            print(f"... PROCESANDO ARCHIVO: {args.archivo} ...")
+            esquema = EsquemaCalif.desde_archivo(args.esquema) if args.esquema else None
+            opciones = {}
+            if args.modo == 'paralelo':
+                opciones = {'workers': args.workers, 'chunk_size': args.chunk_size}
+            metricas = None
+            if args.metricas:
+                modo = 'stream' if args.stream else 'perfil_columnas' if args.perfil_columnas else args.modo
+                metricas = Metricas(os.path.getsize(args.archivo), modo)
+            if args.profile:
+                _, grupos = perfilar(analizar_archivo, (args, esquema, opciones, metricas),
+                                     args.profile, args.profile_top)
+            else:
+                analizar_archivo(args, esquema, opciones, metricas)
             print("\n... FIN DEL ANALISIS ...")
             
+            if args.profile:
+                print("\n...:: PERFIL ::...")
+                for linea in tabla_grupos(grupos):
+                    print(linea)
+                print(f"Volcado pstats: {args.profile}")
+                print(f"Resumen: {args.profile}.txt")
+            
+            if args.metricas == 'json':
+                print(metricas.como_json(), file=sys.stderr)
+            elif args.metricas == 'texto':
+                print("\n...:: METRICAS ::...")
+                print(metricas.como_texto())
+            
         except FileNotFoundError:
-            print(f"Error: no se encontro el archivo '{argv[1]}'")
+            print(f"Error: no se encontro el archivo '{args.archivo}'")
         except Exception as e:
             print(f"Error al procesar archivo: {str(e)}")
     
     else:
         print("... ANALIZADOR CSV ANTLR4 (Python) ...\n")
+        # --no-interactivo tambien aplica a los ejemplos
+        salida = False if args.no_interactivo else None
+        reporte = Reporte(args.verbosidad, args.muestra)
 
         print("\n--- EJEMPLO 1: CSV de calificaciones ---")
         csv1 = """,,PA,Q1,Q2,PA,PA,LAB,EXA,PA,CAL,RED
@@ -213,29 +764,29 @@ def main(argv):
         3,ARIAS FLORES RAFAEL,10,6,4.6,10,10,10,6.75,10,,
         4,ARIAS HERNÁNDEZ MARIO DE JESÚS,0,0,4,10,10,10,7.0,10,,
         5,ARMENTA FUENTES LOBSANG LEONARDO,10,3,3,10,10,10,7.0,10,,"""
-        analyze_csv(csv1)
+        analyze_csv(csv1, salida=salida, reporte=reporte)
 
         print("\n\n--- EJEMPLO 2: CSV Simple ---")
         csv2 = """nombre,edad,estado
         Cristian Echevarria,24,Nayarit
         Oscar Teran,28,"""
-        analyze_csv(csv2)
+        analyze_csv(csv2, salida=salida, reporte=reporte)
 
         print("\n\n--- ERROR: Archivo vacio ---")
         empty_file = ""
-        analyze_csv(empty_file)
+        analyze_csv(empty_file, salida=salida, reporte=reporte)
 
         print("\n\n--- ERROR: Solo espacios en blanco ---")
         whitespace_only = """   
         
         """
-        analyze_csv(whitespace_only)
+        analyze_csv(whitespace_only, salida=salida, reporte=reporte)
 
         print("\n\n--- ERROR: Comillas mal escapadas ---")
         bad_escape = """nombre,comentario
         Cristian,"Dijo: "hola" y se fue"
         Oscar,Normal"""
-        analyze_csv(bad_escape)
+        analyze_csv(bad_escape, salida=salida, reporte=reporte)
 
         print("\n\n--- ERROR: HTML (no es CSV) ---")
         html_invalid = """<!DOCTYPE html>
@@ -247,13 +798,13 @@ def main(argv):
         </table>
         </body>
         </html>"""
-        analyze_csv(html_invalid)
+        analyze_csv(html_invalid, salida=salida, reporte=reporte)
 
         print("\n\n--- ERROR: Caracteres especiales sin comillas ---")
         special_chars = """nombre,edad
         Cristian@#$%,24
         Oscar,27"""
-        analyze_csv(special_chars)
+        analyze_csv(special_chars, salida=salida, reporte=reporte)
 
         print("\n\n--- ERROR: Estructura de Python (no es CSV) ---")
         python_dict = """data = {
@@ -261,7 +812,7 @@ def main(argv):
             'edad': 24,
             'estado': 'Nayarit'
         }"""
-        analyze_csv(python_dict)
+        analyze_csv(python_dict, salida=salida, reporte=reporte)
 
         print("\n... FIN DE PRUEBAS ...")
 
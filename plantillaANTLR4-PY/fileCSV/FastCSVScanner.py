@@ -0,0 +1,96 @@
+import re
+
+from CSVEstadisticas import EstadisticasCSV
+
+# STRING de CSV.g4: '"' ('""' | ~'"')* '"'  (bucle desenrollado para que sea lineal)
+_QUOTED = re.compile(r'"([^"]*(?:""[^"]*)*)"')
+# TEXT de CSV.g4: ~[,\n\r"]+  (vacio = EmptyField)
+_TEXT = re.compile(r'[^,\n\r"]*')
+
+
+def _scan_quoted_row(text, pos):
+    """
+    Escanea una fila que contiene comillas a partir de pos
+
+    Regresa (campos, posicion despues de la fila) o None si la fila no es valida.
+    """
+    fields = []
+    n = len(text)
+
+    while True:
+        m = _QUOTED.match(text, pos)
+        if m:
+            fields.append(m.group(1).replace('""', '"'))
+        else:
+            m = _TEXT.match(text, pos)
+            fields.append(m.group(0).strip())
+        pos = m.end()
+
+        if pos == n:
+            return fields, pos
+
+        c = text[pos]
+        if c == ',':
+            pos += 1
+        elif c == '\n':
+            return fields, pos + 1
+        elif c == '\r' and text.startswith('\r\n', pos):
+            return fields, pos + 2
+        else:
+            # comilla dentro de TEXT, texto pegado a un STRING o '\r' suelto
+            return None
+
+
+def scan_csv(input_text, con_encabezado=True, on_row=None, por_columna=False):
+    """
+    Escaner hecho a mano que sigue las reglas de CSV.g4
+
+    Regresa la misma estructura que FileCSVVisitorImpl o None si encuentra algo
+    que no sabe resolver; en ese caso el texto se debe pasar al parser de antlr4.
+    El salto de linea final es opcional igual que en el resultado de antlr4, que
+    lo inserta al recuperarse cuando falta. Con on_row cada fila (incluido el
+    encabezado) se entrega ahi en lugar de guardarse, como en FileCSVListenerImpl;
+    si el escaner regresa None, on_row ya recibio las filas anteriores al problema.
+    por_columna pide las estadisticas por columna ademas de los conteos (ver EstadisticasCSV).
+    """
+    all_rows = []
+    entregar = all_rows.append if on_row is None else on_row
+    header = None
+    estadisticas = EstadisticasCSV(con_encabezado, por_columna)
+    n = len(input_text)
+    pos = 0
+
+    while True:
+        end = input_text.find('\n', pos)
+        if end == -1:
+            end = n
+        line = input_text[pos:end]
+
+        if '"' in line:
+            scanned = _scan_quoted_row(input_text, pos)
+            if scanned is None:
+                return None
+            fields, pos = scanned
+        else:
+            if end < n and line.endswith('\r'):
+                line = line[:-1]
+            if '\r' in line:
+                return None
+            fields = [field.strip() for field in line.split(',')]
+            pos = end + 1
+
+        estadisticas.agregar_fila(fields)
+        entregar(fields)
+        if header is None:
+            header = fields
+
+        # el ultimo salto de linea no abre una fila nueva
+        if pos >= n:
+            break
+
+    return {
+        'header': header,
+        'rows': all_rows[1:],
+        'total_fields': estadisticas.campos,
+        'estadisticas': estadisticas
+    }
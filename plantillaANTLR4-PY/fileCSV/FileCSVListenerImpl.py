@@ -0,0 +1,84 @@
+from CSVListener import CSVListener
+from CSVParser import CSVParser
+from CSVEstadisticas import EstadisticasCSV
+
+
+class FileCSVListenerImpl(CSVListener):
+    """
+    Implementacion del listener que arma las filas mientras el parser avanza
+
+    Se registra con parser.addParseListener() y parser.buildParseTrees = False,
+    asi cada contexto se descarta al terminar su regla. La memoria solo es
+    O(fila) si los tokens tambien se descartan (UnbufferedTokenStream, modo
+    sin_buffer); con CommonTokenStream se guardan los de todo el archivo.
+    Si se pasa on_row, cada fila (incluido el encabezado) se entrega ahi en lugar
+    de acumularse en data['rows']. Los conteos (y con por_columna las estadisticas
+    por columna) se acumulan en data['estadisticas'] aun cuando las filas no se guardan.
+    """
+    def __init__(self, on_row=None, con_encabezado=True, por_columna=False):
+        self.estadisticas = EstadisticasCSV(con_encabezado, por_columna)
+        self.data = {
+            'header': None,
+            'rows': [],
+            'total_fields': 0,
+            'estadisticas': self.estadisticas
+        }
+        self.on_row = on_row
+        self._fields = None
+        self._first_row = True
+
+    def enterRow(self, ctx: CSVParser.RowContext):
+        """
+        Empieza una fila nueva
+        """
+        self._fields = []
+
+    def exitRow(self, ctx: CSVParser.RowContext):
+        """
+        Cierra la fila actual y la entrega (o la guarda)
+        """
+        fields = self._fields
+        self._fields = None
+        self.estadisticas.agregar_fila(fields)
+        self.data['total_fields'] = self.estadisticas.campos
+
+        # La primera fila se considera encabezado
+        if self._first_row:
+            self.data['header'] = fields
+            self._first_row = False
+            if self.on_row is None:
+                return
+
+        if self.on_row is not None:
+            self.on_row(fields)
+        else:
+            self.data['rows'].append(fields)
+
+    def exitTextField(self, ctx: CSVParser.TextFieldContext):
+        """
+        Campo de texto simple
+        """
+        self._add_field(ctx.TEXT().getText().strip())
+
+    def exitQuotedField(self, ctx: CSVParser.QuotedFieldContext):
+        """
+        Campo entre comillas (se quitan las externas y se convierte "" a ")
+        """
+        self._add_field(ctx.STRING().getText()[1:-1].replace('""', '"'))
+
+    def exitEmptyField(self, ctx: CSVParser.EmptyFieldContext):
+        """
+        Campo vacío
+        """
+        self._add_field("")
+
+    def visitTerminal(self, node):
+        """
+        Sin arbol, los saltos de linea se colgarian del contexto raiz; se sueltan enseguida
+        """
+        parent = node.parentCtx
+        if isinstance(parent, CSVParser.CsvFileContext):
+            parent.removeLastChild()
+
+    def _add_field(self, field_value):
+        self._fields.append(field_value)
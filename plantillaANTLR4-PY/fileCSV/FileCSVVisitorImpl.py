@@ -1,37 +1,47 @@
 from CSVVisitor import CSVVisitor
 from CSVParser import CSVParser
+from CSVEstadisticas import EstadisticasCSV
 
 
 class FileCSVVisitorImpl(CSVVisitor):
     """
     Implementacion del visitor para procesar archivos CSV
+
+    Cada fila se pasa a data['estadisticas'] en cuanto se visita (ver EstadisticasCSV;
+    las estadisticas por columna solo con por_columna).
+    Los rangos de las calificaciones se validan despues, por columnas (ver CSVValidacion).
+    Con on_row cada fila (incluido el encabezado) se entrega ahi en lugar de
+    acumularse en data['rows'], igual que en FileCSVListenerImpl.
     """
-    def __init__(self):
+    def __init__(self, con_encabezado=True, on_row=None, por_columna=False):
+        self.estadisticas = EstadisticasCSV(con_encabezado, por_columna)
         self.data = {
             'header': None,
             'rows': [],
-            'total_fields': 0
+            'total_fields': 0,
+            'estadisticas': self.estadisticas
         }
+        self.on_row = on_row
     
     def visitCsvFile(self, ctx: CSVParser.CsvFileContext):
         """
         Visita el archivo CSV completo
         """
-        all_rows = []
-        
         # Procesar todas las filas
         for i, row_ctx in enumerate(ctx.row()):
             row_data = self.visit(row_ctx)
-            all_rows.append(row_data)
+            self.estadisticas.agregar_fila(row_data)
             
             # La primera fila se considera encabezado
             if i == 0:
                 self.data['header'] = row_data
-            else:
+            if self.on_row is not None:
+                self.on_row(row_data)
+            elif i > 0:
                 self.data['rows'].append(row_data)
         
-        # Contar el total de campos
-        self.data['total_fields'] = sum(len(row) for row in all_rows)
+        # El total de campos ya se conto al visitar cada fila
+        self.data['total_fields'] = self.estadisticas.campos
         
         return self.data
     
@@ -39,28 +49,8 @@ class FileCSVVisitorImpl(CSVVisitor):
         """
         Visita una fila (sin importar si tiene newline o no)
         """
-        fields = []
-        field_contexts = ctx.field()
-        
-        for field_index, field_ctx in enumerate(field_contexts):
-            # Obtener el valor del campo usando el visitor apropiado
-            field_value = self.visit(field_ctx)
-            
-            # Validacion opcional para calificaciones (columnas numéricas)
-            if field_value and len(field_value) > 0:
-                # Si estamos en una columna que podria ser calificacion (a partir de la columna 2)
-                if field_index >= 2:  # Las columnas de numeros empiezan en indice 2
-                    try:
-                        grade = float(field_value)
-                        if not (0 <= grade <= 10):
-                            print(f"Advertencia: Calificación inválida '{field_value}' en columna {field_index + 1}")
-                    except ValueError:
-                        # No es un numero, no hay problema (puede ser texto)
-                        pass
-            
-            fields.append(field_value)
-        
-        return fields
+        # Obtener el valor de cada campo usando el visitor apropiado
+        return [self.visit(field_ctx) for field_ctx in ctx.field()]
     
     def visitField(self, ctx: CSVParser.FieldContext):
         """
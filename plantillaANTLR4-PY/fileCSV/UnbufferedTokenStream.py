@@ -0,0 +1,135 @@
+from antlr4.Token import Token
+from antlr4.BufferedTokenStream import TokenStream
+from antlr4.error.Errors import IllegalStateException
+
+
+class UnbufferedTokenStream(TokenStream):
+    """
+    TokenStream que no guarda los tokens ya consumidos (port del de la runtime de Java)
+
+    CommonTokenStream conserva todos los tokens del archivo; aqui el buffer solo
+    crece mientras el parser tiene marcas abiertas (la prediccion de alternativas
+    necesita regresar) y se vacia en cuanto las suelta, asi la memoria depende
+    del lookahead y no del tamaño del archivo. index es absoluto, igual que en
+    BufferedTokenStream, pero solo se puede regresar dentro del buffer.
+    """
+    def __init__(self, tokenSource):
+        self.tokenSource = tokenSource
+        self.tokens = []
+        # posicion del token actual dentro de tokens
+        self.p = 0
+        self.numMarkers = 0
+        self.lastToken = None
+        self.lastTokenBufferStart = None
+        # indice absoluto del token actual
+        self.index = 0
+        self.fill(1)
+
+    def _bufferStartIndex(self):
+        return self.index - self.p
+
+    def get(self, i):
+        start = self._bufferStartIndex()
+        if i < start or i >= start + len(self.tokens):
+            raise IndexError(f"get({i}) fuera del buffer {start}..{start + len(self.tokens) - 1}")
+        return self.tokens[i - start]
+
+    def LT(self, i):
+        if i == -1:
+            return self.lastToken
+        self.sync(i)
+        index = self.p + i - 1
+        if index < 0:
+            raise IndexError(f"LT({i}) da un indice negativo")
+        if index >= len(self.tokens):
+            # ya se leyo EOF: se repite
+            return self.tokens[-1]
+        return self.tokens[index]
+
+    def LA(self, i):
+        return self.LT(i).type
+
+    def consume(self):
+        if self.LA(1) == Token.EOF:
+            raise IllegalStateException("cannot consume EOF")
+
+        self.lastToken = self.tokens[self.p]
+        # en el ultimo token y sin marcas: se puede vaciar el buffer
+        if self.p == len(self.tokens) - 1 and self.numMarkers == 0:
+            self.tokens.clear()
+            self.p = -1
+            self.lastTokenBufferStart = self.lastToken
+        self.p += 1
+        self.index += 1
+        self.sync(1)
+
+    def sync(self, want):
+        need = (self.p + want - 1) - len(self.tokens) + 1
+        if need > 0:
+            self.fill(need)
+
+    def fill(self, n):
+        for i in range(n):
+            if self.tokens and self.tokens[-1].type == Token.EOF:
+                return i
+            t = self.tokenSource.nextToken()
+            t.tokenIndex = self._bufferStartIndex() + len(self.tokens)
+            self.tokens.append(t)
+        return n
+
+    def mark(self):
+        if self.numMarkers == 0:
+            self.lastTokenBufferStart = self.lastToken
+        mark = -self.numMarkers - 1
+        self.numMarkers += 1
+        return mark
+
+    def release(self, marker):
+        if marker != -self.numMarkers:
+            raise IllegalStateException("release() called with an invalid marker.")
+        self.numMarkers -= 1
+        if self.numMarkers == 0:
+            # se descarta lo anterior al token actual
+            if self.p > 0:
+                del self.tokens[:self.p]
+                self.p = 0
+            self.lastTokenBufferStart = self.lastToken
+
+    def seek(self, index):
+        if index == self.index:
+            return
+        if index > self.index:
+            self.sync(index - self.index)
+            index = min(index, self._bufferStartIndex() + len(self.tokens) - 1)
+
+        i = index - self._bufferStartIndex()
+        if i < 0:
+            raise IndexError(f"no se puede regresar al token {index}: ya se descarto")
+        if i >= len(self.tokens):
+            raise IndexError(f"seek({index}) fuera del buffer")
+        self.p = i
+        self.index = index
+        self.lastToken = self.lastTokenBufferStart if i == 0 else self.tokens[i - 1]
+
+    def getText(self, start=None, stop=None):
+        # solo se puede armar con los tokens que siguen en el buffer
+        if isinstance(start, Token):
+            start = start.tokenIndex
+        if isinstance(stop, Token):
+            stop = stop.tokenIndex
+        first = self._bufferStartIndex()
+        start = first if start is None else max(start, first)
+        stop = first + len(self.tokens) - 1 if stop is None else min(stop, first + len(self.tokens) - 1)
+        parts = []
+        for t in self.tokens[start - first:stop - first + 1]:
+            if t.type == Token.EOF:
+                break
+            parts.append(t.text)
+        return ''.join(parts)
+
+    def getTokenSource(self):
+        return self.tokenSource
+
+    @property
+    def size(self):
+        raise IllegalStateException("Unbuffered stream cannot know its size")